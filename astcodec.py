@@ -0,0 +1,446 @@
+# astcodec.py - Codificación binaria plana del AST
+#
+# El AST se guarda como un flujo marshal (versión 4) precedido por una
+# cabecera propia. marshal ya es una codificación plana en preorden:
+#
+#   ')' n / '(' n     tupla de n elementos (nodo: el primero es el tipo)
+#   '[' n             lista de n elementos
+#   'Z' / 'u' ...     string; la primera aparición lleva la marca de
+#                     referencia (0x80) y las siguientes son 'r' índice,
+#                     así que funciona como tabla de strings
+#   'i' / 'l' / 'g'   entero de 32 bits / entero grande / float
+#   'N' 'T' 'F'       None, True, False
+#
+# Codificar y decodificar con marshal corre en C: es más rápido que
+# pickle (que además arma el memo de cada tupla), a cambio de un flujo
+# algo más grande (las referencias ocupan siempre 5 bytes). Para guardar
+# en disco conviene comprimirlo.
+#
+# marshal se niega a pasar de ~2000 niveles de anidamiento. Esos ASTs
+# (expresiones muy largas) se escriben con un codificador iterativo en el
+# mismo formato y se leen con el decodificador iterativo, sin límite de
+# profundidad; la cabecera lo indica con F_DEEP.
+#
+# FlatAst recorre el flujo sin reconstruir las tuplas: los nodos se leen
+# bajo demanda. Entiende el subconjunto de marshal que usa un AST
+# (tuplas, listas, str, int, float, bool y None).
+import marshal
+import struct
+import sys
+
+MAGIC = b'GLA2'
+MARSHAL_VERSION = 4
+# magic, versión de marshal, flags
+_HEADER = struct.Struct('<4sBB')
+F_DEEP = 1
+
+KINDS = frozenset(('program', 'package', 'import', 'func', 'var', 'declare_short',
+                   'assign', 'if', 'block', 'binop', 'unary', 'call', 'empty_stmt'))
+
+FLAG_REF = 0x80
+(_SMALL_TUPLE, _TUPLE, _LIST, _REF, _INT, _LONG, _FLOAT, _NONE, _TRUE, _FALSE,
+ _SHORT_ASCII, _SHORT_ASCII_INTERNED, _ASCII, _ASCII_INTERNED, _UNICODE,
+ _INTERNED) = b')([rilgNTFzZaAut'
+
+_I32 = struct.Struct('<i')
+_U32 = struct.Struct('<I')
+_F64 = struct.Struct('<d')
+
+# Resultado de _head()
+_K_TUPLE, _K_LIST, _K_LEAF, _K_REF = range(4)
+
+
+class CodecError(ValueError):
+    pass
+
+
+# Codificación
+def encode(ast):
+    """AST -> bytes"""
+    flags = 0
+    try:
+        payload = marshal.dumps(ast, MARSHAL_VERSION)
+    except ValueError:
+        # Demasiado profundo para marshal (o un valor que no es del AST:
+        # el codificador iterativo lo rechaza con CodecError)
+        payload = _encode_iterative(ast)
+        flags |= F_DEEP
+    return _HEADER.pack(MAGIC, MARSHAL_VERSION, flags) + payload
+
+
+def _encode_iterative(ast):
+    """Mismo formato que marshal.dumps(), sin recursión"""
+    out = bytearray()
+    string_refs = {}
+    stack = [ast]
+    pop = stack.pop
+    push = stack.extend
+    while stack:
+        v = pop()
+        t = type(v)
+        if t is str:
+            idx = string_refs.get(v)
+            if idx is not None:
+                out.append(_REF)
+                out += _U32.pack(idx)
+                continue
+            string_refs[v] = len(string_refs)
+            raw = v.encode('utf-8', 'surrogatepass')
+            if not v.isascii():
+                out.append(_UNICODE | FLAG_REF)
+                out += _U32.pack(len(raw))
+            elif len(raw) < 256:
+                out.append(_SHORT_ASCII_INTERNED | FLAG_REF)
+                out.append(len(raw))
+            else:
+                out.append(_ASCII_INTERNED | FLAG_REF)
+                out += _U32.pack(len(raw))
+            out += raw
+        elif t is tuple:
+            if len(v) < 256:
+                out.append(_SMALL_TUPLE)
+                out.append(len(v))
+            else:
+                out.append(_TUPLE)
+                out += _U32.pack(len(v))
+            push(reversed(v))
+        elif t is list:
+            out.append(_LIST)
+            out += _U32.pack(len(v))
+            push(reversed(v))
+        elif t is int:
+            if -(1 << 31) <= v < (1 << 31):
+                out.append(_INT)
+                out += _I32.pack(v)
+            else:
+                # Dígitos de 15 bits, el menos significativo primero
+                digits = []
+                rest = abs(v)
+                while rest:
+                    digits.append(rest & 0x7fff)
+                    rest >>= 15
+                out.append(_LONG)
+                out += _I32.pack(len(digits) if v > 0 else -len(digits))
+                out += struct.pack(f'<{len(digits)}H', *digits)
+        elif t is float:
+            out.append(_FLOAT)
+            out += _F64.pack(v)
+        elif v is None:
+            out.append(_NONE)
+        elif t is bool:
+            out.append(_TRUE if v else _FALSE)
+        else:
+            raise CodecError(f"Valor no soportado en el AST: {v!r}")
+    return bytes(out)
+
+
+# Lectura del flujo
+def _check_header(data):
+    try:
+        magic, version, flags = _HEADER.unpack_from(data)
+    except struct.error:
+        raise CodecError("Datos truncados")
+    if magic != MAGIC:
+        raise CodecError("No es un AST codificado (magic inválido)")
+    if version != MARSHAL_VERSION:
+        raise CodecError(f"Versión de marshal no soportada: {version}")
+    return flags
+
+
+def _head(data, pos):
+    """
+    Lee el elemento en pos: (clase, valor, siguiente posición, marcado).
+    Para tuplas y listas el valor es la cantidad de elementos (que siguen a
+    continuación), para 'r' el índice de la referencia.
+    """
+    code = data[pos]
+    t = code & ~FLAG_REF
+    flagged = code & FLAG_REF
+    p = pos + 1
+    if t == _SMALL_TUPLE:
+        return _K_TUPLE, data[p], p + 1, flagged
+    if t == _SHORT_ASCII_INTERNED or t == _SHORT_ASCII:
+        end = p + 1 + data[p]
+        return _K_LEAF, data[p + 1:end].decode('ascii'), end, flagged
+    if t == _REF:
+        return _K_REF, _U32.unpack_from(data, p)[0], p + 4, 0
+    if t == _INT:
+        return _K_LEAF, _I32.unpack_from(data, p)[0], p + 4, flagged
+    if t == _TUPLE or t == _LIST:
+        kind = _K_TUPLE if t == _TUPLE else _K_LIST
+        return kind, _U32.unpack_from(data, p)[0], p + 4, flagged
+    if t == _NONE:
+        return _K_LEAF, None, p, 0
+    if t == _TRUE or t == _FALSE:
+        return _K_LEAF, t == _TRUE, p, 0
+    if t in (_UNICODE, _INTERNED, _ASCII, _ASCII_INTERNED):
+        end = p + 4 + _U32.unpack_from(data, p)[0]
+        return _K_LEAF, data[p + 4:end].decode('utf-8', 'surrogatepass'), end, flagged
+    if t == _FLOAT:
+        return _K_LEAF, _F64.unpack_from(data, p)[0], p + 8, flagged
+    if t == _LONG:
+        n = _I32.unpack_from(data, p)[0]
+        digits = struct.unpack_from(f'<{abs(n)}H', data, p + 4)
+        value = 0
+        for d in reversed(digits):
+            value = (value << 15) | d
+        return _K_LEAF, -value if n < 0 else value, p + 4 + 2 * abs(n), flagged
+    raise CodecError(f"Tipo no soportado en el flujo: {chr(t)!r} (posición {pos})")
+
+
+def _build(data, pos, resolve, refs=None):
+    """
+    Reconstruye el objeto en pos sin recursión. Retorna (objeto, posición
+    siguiente). resolve(i) da el objeto de la referencia i; si se pasa
+    refs, los objetos marcados se van agregando ahí en orden.
+    """
+    stack = []  # [elementos, faltan, es lista, índice de referencia]
+    while True:
+        kind, value, pos, flagged = _head(data, pos)
+        if kind == _K_REF:
+            value = resolve(value)
+        elif kind != _K_LEAF:
+            slot = None
+            if flagged and refs is not None:
+                slot = len(refs)
+                refs.append(None)
+            if value:
+                stack.append([[], value, kind == _K_LIST, slot])
+                continue
+            value = [] if kind == _K_LIST else ()
+            if slot is not None:
+                refs[slot] = value
+        elif flagged and refs is not None:
+            refs.append(value)
+
+        # Agregar el valor y cerrar los contenedores que se completaron
+        while stack:
+            top = stack[-1]
+            top[0].append(value)
+            top[1] -= 1
+            if top[1]:
+                break
+            stack.pop()
+            items, _, is_list, slot = top
+            value = items if is_list else tuple(items)
+            if slot is not None:
+                refs[slot] = value
+        else:
+            return value, pos
+
+
+# Decodificación completa
+def decode(data):
+    """bytes -> AST (tuplas y listas)"""
+    data = bytes(data)
+    flags = _check_header(data)
+    start = _HEADER.size
+    try:
+        if not flags & F_DEEP:
+            return marshal.loads(memoryview(data)[start:])
+        refs = []
+        return _build(data, start, refs.__getitem__, refs)[0]
+    except (EOFError, ValueError, TypeError, IndexError, struct.error) as e:
+        if isinstance(e, CodecError):
+            raise
+        raise CodecError(f"Datos inválidos: {e}")
+
+
+# Decodificación perezosa
+class FlatAst:
+    """
+    Vista del AST codificado. Los nodos se leen sólo cuando se piden:
+        flat = FlatAst(data)
+        for node in flat.nodes('call'):
+            node.kind, node[0], node.materialize()
+    """
+    def __init__(self, data):
+        self.data = bytes(data)
+        self.flags = _check_header(self.data)
+        self.start = _HEADER.size
+        self._containers = None
+        self._refs = None
+
+    @classmethod
+    def from_ast(cls, ast):
+        return cls(encode(ast))
+
+    def _index(self):
+        """
+        Una pasada sobre el flujo (se hace una vez): por cada tupla o lista
+        [fin, elementos, posición del primer elemento, es lista], y la
+        posición de cada objeto marcado como referencia.
+        """
+        if self._containers is not None:
+            return self._containers
+        data = self.data
+        containers = {}
+        refs = []
+        stack = []  # [posición, elementos que faltan]
+        pos = self.start
+        try:
+            while True:
+                kind, value, end, flagged = _head(data, pos)
+                if flagged:
+                    refs.append(pos)
+                if kind == _K_TUPLE or kind == _K_LIST:
+                    containers[pos] = [end, value, end, kind == _K_LIST]
+                    if value:
+                        stack.append([pos, value])
+                        pos = end
+                        continue
+                while stack:
+                    top = stack[-1]
+                    top[1] -= 1
+                    if top[1]:
+                        break
+                    containers[top[0]][0] = end
+                    stack.pop()
+                if not stack:
+                    break
+                pos = end
+        except (IndexError, struct.error, UnicodeDecodeError) as e:
+            raise CodecError(f"Datos truncados o inválidos: {e}")
+        self._containers = containers
+        self._refs = refs
+        return containers
+
+    def end_of(self, pos):
+        """Posición siguiente al subárbol que empieza en pos"""
+        info = self._index().get(pos)
+        return info[0] if info is not None else _head(self.data, pos)[2]
+
+    def value_at(self, pos):
+        """Valor en la posición: hoja materializada o NodeView"""
+        kind, value, _, _ = _head(self.data, pos)
+        if kind == _K_LEAF:
+            return value
+        if kind == _K_REF:
+            self._index()
+            return self.value_at(self._refs[value])
+        return NodeView(self, pos)
+
+    def root(self):
+        return self.value_at(self.start)
+
+    def _kind_at(self, pos):
+        """Tipo del nodo que empieza en pos, o None si no es un nodo del AST"""
+        end, count, first, is_list = self._index()[pos]
+        if is_list or not count:
+            return None
+        kind = self.value_at(first)
+        return kind if type(kind) is str and kind in KINDS else None
+
+    def nodes(self, kind=None):
+        """NodeView de cada nodo (opcionalmente de un tipo) en preorden, sin reconstruir nada"""
+        for pos in self._index():
+            k = self._kind_at(pos)
+            if k is not None and (kind is None or k == kind):
+                yield NodeView(self, pos)
+
+    def count_kinds(self):
+        counts = {}
+        for pos in self._index():
+            kind = self._kind_at(pos)
+            if kind is not None:
+                counts[kind] = counts.get(kind, 0) + 1
+        return counts
+
+    def materialize(self, pos=None):
+        """Reconstruye el subárbol que empieza en pos (por defecto, todo)"""
+        if pos is None or pos == self.start:
+            return decode(self.data)
+        self._index()
+        refs = self._refs
+        try:
+            return _build(self.data, pos, lambda i: self.materialize(refs[i]))[0]
+        except (IndexError, struct.error, UnicodeDecodeError) as e:
+            raise CodecError(f"Datos truncados o inválidos: {e}")
+
+
+class NodeView:
+    """Nodo del AST codificado; los hijos se leen bajo demanda"""
+    __slots__ = ('flat', 'pos')
+
+    def __init__(self, flat, pos):
+        self.flat = flat
+        self.pos = pos
+
+    @property
+    def kind(self):
+        """Tipo del nodo ('binop', ...) o 'tuple' / 'list'"""
+        kind = self.flat._kind_at(self.pos)
+        if kind is not None:
+            return kind
+        return 'list' if self.flat._index()[self.pos][3] else 'tuple'
+
+    def _is_node(self):
+        return self.flat._kind_at(self.pos) is not None
+
+    def __len__(self):
+        count = self.flat._index()[self.pos][1]
+        return count - 1 if self._is_node() else count
+
+    def child_positions(self):
+        flat = self.flat
+        _, count, pos, _ = flat._index()[self.pos]
+        if self._is_node():
+            pos = flat.end_of(pos)
+            count -= 1
+        for _ in range(count):
+            yield pos
+            pos = flat.end_of(pos)
+
+    def __iter__(self):
+        for pos in self.child_positions():
+            yield self.flat.value_at(pos)
+
+    def __getitem__(self, i):
+        """Hijo i (para nodos, sin contar el tipo: node[0] es el primer campo)"""
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        for k, pos in enumerate(self.child_positions()):
+            if k == i:
+                return self.flat.value_at(pos)
+
+    def materialize(self):
+        return self.flat.materialize(self.pos)
+
+    def __repr__(self):
+        return f"<NodeView {self.kind} @{self.pos}>"
+
+
+def benchmark(funcs=3000, repeat=5):
+    """Compara codificar y decodificar un AST grande contra pickle"""
+    import pickle
+    import time
+
+    from goYacc import parse_code
+    from rdparser import make_benchmark_source
+
+    _, ast, _ = parse_code(make_benchmark_source(funcs), do_semantic=False)
+
+    def best(fn, arg):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn(arg)
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    for label, dump, load in (('pickle', lambda a: pickle.dumps(a, protocol=5), pickle.loads),
+                              ('astcodec', encode, decode)):
+        data = dump(ast)
+        print(f"  {label:<9} {len(data) / 1024:9.1f} KB  codificar {best(dump, ast):6.3f}s  "
+              f"decodificar {best(load, data):6.3f}s")
+    flat = FlatAst(encode(ast))
+    start = time.perf_counter()
+    counts = flat.count_kinds()
+    print(f"  FlatAst   conteo por tipo sin reconstruir: {time.perf_counter() - start:6.3f}s "
+          f"({sum(counts.values())} nodos)")
+
+
+if __name__ == '__main__':
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 3000)
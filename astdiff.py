@@ -0,0 +1,262 @@
+# astdiff.py - Hash estructural (Merkle) del AST y diff entre versiones
+#
+# MerkleHasher calcula bajo demanda un hash de cada nodo a partir de su
+# tipo y de los hashes de sus hijos, y lo guarda en una caché lateral
+# (id del nodo -> (nodo, hash)): los nodos son tuplas y no pueden llevar
+# atributos. Dos subárboles con la misma estructura tienen el mismo hash
+# aunque sean objetos distintos.
+#
+# diff_programs() compara dos ASTs 'program' bajando sólo por los
+# subárboles cuyo hash difiere:
+#   - declaraciones de nivel superior por clave (func por nombre, import
+#     por ruta, package)
+#   - sentencias de una función alineadas por hash: se recortan el prefijo
+#     y el sufijo iguales y sólo el tramo del medio pasa por SequenceMatcher
+#   - un if cambiado se compara rama por rama
+#
+# Para no recorrer los dos árboles enteros en el primer diff, el hasher
+# puede hacer de constructor de nodos del parser:
+# parse_code(..., hashcons=MerkleHasher(HashConsFactory())). Cada nodo se
+# hashea al construirse (sus hijos ya están en la caché) y, con la misma
+# fábrica para las dos versiones, los subárboles que no cambiaron son el
+# mismo objeto: el diff queda proporcional al cambio. Sin eso, el primer
+# digest() de cada árbol es O(n).
+import hashlib
+import sys
+from collections import namedtuple
+from difflib import SequenceMatcher
+
+ADDED = 'added'
+REMOVED = 'removed'
+CHANGED = 'changed'
+
+# path: ('func main', 3, 'then', 2) hasta la sentencia (índices de la
+# versión nueva, o de la vieja en REMOVED); old / new: nodos (o None)
+Change = namedtuple('Change', 'kind path old new')
+
+_SYMBOLS = {ADDED: '+', REMOVED: '-', CHANGED: '~'}
+
+
+class MerkleHasher:
+    def __init__(self, factory=None, digest_size=16):
+        self.digest_size = digest_size
+        self.factory = factory    # HashConsFactory opcional para node()
+        self._cache = {}
+
+    def node(self, *fields):
+        """Constructor de nodos para parse_code(hashcons=...): hashea al construir"""
+        node = self.factory.node(*fields) if self.factory is not None else fields
+        self.digest(node)
+        return node
+
+    def _leaf(self, value):
+        text = f"{type(value).__name__}:{value!r}".encode('utf-8')
+        return hashlib.blake2b(text, digest_size=self.digest_size).digest()
+
+    def digest(self, value):
+        """Hash estructural (bytes) de un nodo, lista o literal"""
+        if not isinstance(value, (tuple, list)):
+            return self._leaf(value)
+        cache = self._cache
+        found = cache.get(id(value))
+        if found is not None:
+            return found[1]
+        # Post-orden iterativo: los árboles de expresiones pueden ser muy profundos
+        stack = [(value, False)]
+        while stack:
+            node, ready = stack.pop()
+            if id(node) in cache:
+                continue
+            if not ready:
+                stack.append((node, True))
+                stack.extend((child, False) for child in node
+                             if isinstance(child, (tuple, list)) and id(child) not in cache)
+                continue
+            h = hashlib.blake2b(b'T' if isinstance(node, tuple) else b'L',
+                                digest_size=self.digest_size)
+            for child in node:
+                if isinstance(child, (tuple, list)):
+                    h.update(cache[id(child)][1])
+                else:
+                    h.update(self._leaf(child))
+            cache[id(node)] = (node, h.digest())
+        return cache[id(value)][1]
+
+    def hexdigest(self, value):
+        return self.digest(value).hex()
+
+    def same(self, a, b):
+        return a is b or self.digest(a) == self.digest(b)
+
+    def clear(self):
+        self._cache.clear()
+        if self.factory is not None:
+            self.factory.clear()
+
+    def __len__(self):
+        return len(self._cache)
+
+
+def _decl_key(node):
+    if not isinstance(node, tuple) or not node:
+        return ('?', repr(node))
+    if node[0] in ('func', 'import'):
+        return (node[0], node[1])
+    return (node[0],)
+
+
+def _label(node):
+    if node[0] in ('func', 'import', 'package'):
+        return f"{node[0]} {node[1]}"
+    return node[0]
+
+
+def _keyed(decls):
+    """{clave: nodo}; una clave repetida (func redeclarada) lleva su número de aparición"""
+    keyed = {}
+    for node in decls:
+        key = _decl_key(node)
+        n = 0
+        while (key, n) in keyed:
+            n += 1
+        keyed[(key, n)] = node
+    return keyed
+
+
+def diff_programs(old, new, hasher=None):
+    """
+    Retorna la lista de Change entre dos ASTs 'program', en el orden de
+    las declaraciones (primero las que siguen o cambian, luego las
+    eliminadas).
+    """
+    if hasher is None:
+        hasher = MerkleHasher()
+    if old is None or new is None:
+        if old is new:
+            return []
+        return [Change(ADDED if old is None else REMOVED, (), old, new)]
+    if hasher.same(old, new):
+        return []
+
+    changes = []
+    old_decls = _keyed(old[1])
+    new_decls = _keyed(new[1])
+    for key, node in new_decls.items():
+        before = old_decls.get(key)
+        path = (_label(node),)
+        if before is None:
+            changes.append(Change(ADDED, path, None, node))
+        elif not hasher.same(before, node):
+            changes.extend(_diff_decl(before, node, path, hasher))
+    for key, node in old_decls.items():
+        if key not in new_decls:
+            changes.append(Change(REMOVED, (_label(node),), node, None))
+    return changes
+
+
+def _diff_decl(old, new, path, hasher):
+    if old[0] != 'func':
+        return [Change(CHANGED, path, old, new)]
+    changes = []
+    # Firma (parámetros o tipo de retorno)
+    if not (hasher.same(old[2], new[2]) and old[3] == new[3]):
+        changes.append(Change(CHANGED, path + ('firma',), old, new))
+    if not hasher.same(old[4], new[4]):
+        changes.extend(diff_statements(old[4], new[4], path, hasher))
+    return changes
+
+
+def diff_statements(old, new, path=(), hasher=None):
+    """Diff de dos listas de sentencias alineadas por hash"""
+    if hasher is None:
+        hasher = MerkleHasher()
+    old = old or []
+    new = new or []
+    a = [hasher.digest(s) for s in old]
+    b = [hasher.digest(s) for s in new]
+
+    # Prefijo y sufijo iguales
+    lo = 0
+    while lo < len(a) and lo < len(b) and a[lo] == b[lo]:
+        lo += 1
+    hi_a, hi_b = len(a), len(b)
+    while hi_a > lo and hi_b > lo and a[hi_a - 1] == b[hi_b - 1]:
+        hi_a -= 1
+        hi_b -= 1
+
+    changes = []
+    matcher = SequenceMatcher(None, a[lo:hi_a], b[lo:hi_b], autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        i1, i2, j1, j2 = i1 + lo, i2 + lo, j1 + lo, j2 + lo
+        if tag == 'equal':
+            continue
+        if tag == 'replace':
+            # Sentencias en la misma posición y del mismo tipo: cambiadas
+            for k in range(min(i2 - i1, j2 - j1)):
+                s_old, s_new = old[i1 + k], new[j1 + k]
+                if _kind(s_old) == _kind(s_new):
+                    changes.extend(_diff_statement(s_old, s_new, path + (j1 + k,), hasher))
+                else:
+                    changes.append(Change(REMOVED, path + (i1 + k,), s_old, None))
+                    changes.append(Change(ADDED, path + (j1 + k,), None, s_new))
+            paired = min(i2 - i1, j2 - j1)
+            i1 += paired
+            j1 += paired
+        for i in range(i1, i2):
+            changes.append(Change(REMOVED, path + (i,), old[i], None))
+        for j in range(j1, j2):
+            changes.append(Change(ADDED, path + (j,), None, new[j]))
+    return changes
+
+
+def _kind(stmt):
+    return stmt[0] if isinstance(stmt, tuple) and stmt else None
+
+
+def _diff_statement(old, new, path, hasher):
+    if old[0] != 'if':
+        return [Change(CHANGED, path, old, new)]
+    changes = []
+    if not hasher.same(old[1], new[1]):
+        changes.append(Change(CHANGED, path + ('cond',), old, new))
+    for i, branch in ((2, 'then'), (3, 'else')):
+        if not hasher.same(old[i], new[i]):
+            changes.extend(diff_statements(old[i], new[i], path + (branch,), hasher))
+    return changes
+
+
+def format_change(change):
+    path = ' > '.join(str(p) for p in change.path) or 'program'
+    node = change.new if change.new is not None else change.old
+    # Sólo las sentencias (ruta terminada en índice) muestran su tipo
+    if node is None or not change.path or not isinstance(change.path[-1], int):
+        return f"{_SYMBOLS[change.kind]} {path}"
+    return f"{_SYMBOLS[change.kind]} {path}  {_label(node)}"
+
+
+def main():
+    if len(sys.argv) != 3:
+        print("Uso: python3 astdiff.py viejo.go nuevo.go")
+        sys.exit(2)
+
+    from goYacc import parse_code
+    from hashcons import HashConsFactory
+
+    # Misma fábrica para las dos versiones: los subárboles iguales se
+    # comparten y cada nodo llega al diff con su hash ya calculado
+    hasher = MerkleHasher(HashConsFactory())
+    asts = []
+    for path in sys.argv[1:]:
+        with open(path, 'r', encoding='utf-8') as f:
+            _, ast, _ = parse_code(f.read(), do_semantic=False, hashcons=hasher)
+        asts.append(ast)
+    hasher.factory.clear()
+
+    changes = diff_programs(*asts, hasher=hasher)
+    for change in changes:
+        print(format_change(change))
+    print(f"\nCambios: {len(changes)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,278 @@
+# astquery.py - Consultas estructurales sobre el AST con índice por tipo de nodo
+#
+# AstIndex recorre el AST una sola vez y guarda cada aparición de un nodo
+# con su padre y un índice tipo -> apariciones. Una consulta empieza por
+# los candidatos del tipo pedido y sólo sube por los padres, así que no
+# vuelve a recorrer el árbol. (Con un AST hash-consed un mismo nodo puede
+# aparecer varias veces: cada aparición tiene su propio id y su padre.)
+#
+# Sintaxis:
+#   consulta := selector ( ('inside' | 'not inside') selector )*
+#   selector := tipo | '*'  [ '[' campo (=|!=) valor ( ',' ... )* ']' ]
+#
+# Ejemplos:
+#   call[pkg=fmt,fn=Println] inside if
+#   assign[op=LSHIFT_ASSIGN]
+#   binop[op=+] inside func[name=main]
+#   declare_short not inside if
+#
+# Los operadores se pueden escribir como texto ('<<=') o con el nombre del
+# token de golex ('LSHIFT_ASSIGN').
+import re
+import sys
+from array import array
+
+# Nombre de cada campo por tipo de nodo (posición 1 en adelante)
+FIELDS = {
+    'program': ('decls',),
+    'package': ('name',),
+    'import': ('path',),
+    'func': ('name', 'params', 'ret', 'body'),
+    'var': ('name', 'type', 'value'),
+    'declare_short': ('name', 'value'),
+    'if': ('cond', 'then', 'else'),
+    'block': ('body',),
+    'binop': ('op', 'left', 'right'),
+    'unary': ('op', 'operand'),
+    'call': ('pkg', 'fn', 'args'),
+    'empty_stmt': (),
+}
+# assign tiene dos formas: ('assign', nombre, expr) y ('assign', op, nombre, expr)
+ASSIGN_FIELDS = ('name', 'value')
+ASSIGN_OP_FIELDS = ('op', 'name', 'value')
+
+# Nombre de token -> texto del operador en el AST
+OP_ALIASES = {
+    'PLUS': '+', 'MINUS': '-', 'TIMES': '*', 'DIVIDE': '/', 'MODULO': '%',
+    'BIT_OR': '|', 'BIT_XOR': '^', 'AND_NOT': '&^', 'LSHIFT': '<<', 'RSHIFT': '>>',
+    'EQ': '==', 'NE': '!=', 'LT': '<', 'LE': '<=', 'GT': '>', 'GE': '>=',
+    'NOT': '!', 'AND': '&&', 'OR': '||',
+    'LSHIFT_ASSIGN': '<<=', 'RSHIFT_ASSIGN': '>>=', 'PLUS_ASSIGN': '+=',
+    'MINUS_ASSIGN': '-=', 'TIMES_ASSIGN': '*=', 'DIVIDE_ASSIGN': '/=',
+    'MOD_ASSIGN': '%=', 'AND_ASSIGN': '&=', 'OR_ASSIGN': '|=', 'XOR_ASSIGN': '^=',
+}
+
+NO_PARENT = -1
+
+
+class QueryError(ValueError):
+    pass
+
+
+def node_fields(node):
+    kind = node[0]
+    if kind == 'assign':
+        return ASSIGN_OP_FIELDS if len(node) == 4 else ASSIGN_FIELDS
+    return FIELDS.get(kind, ())
+
+
+def field_value(node, name):
+    """Valor de un campo por nombre, o None si el nodo no lo tiene"""
+    fields = node_fields(node)
+    if name not in fields:
+        return None
+    i = fields.index(name) + 1
+    return node[i] if i < len(node) else None
+
+
+class AstIndex:
+    def __init__(self, ast):
+        self.nodes = []              # id de aparición -> nodo
+        self.parent = array('i')     # id de aparición -> id del padre
+        self.by_kind = {}            # tipo -> array('i') de apariciones
+        if ast is not None:
+            self._build(ast)
+
+    def _build(self, ast):
+        nodes = self.nodes
+        parent = self.parent
+        by_kind = self.by_kind
+        # (valor, aparición del nodo padre)
+        stack = [(ast, NO_PARENT)]
+        while stack:
+            value, up = stack.pop()
+            if isinstance(value, list):
+                stack.extend((v, up) for v in reversed(value))
+                continue
+            if not isinstance(value, tuple) or not value or not isinstance(value[0], str):
+                continue
+            kind = value[0]
+            if kind not in FIELDS and kind != 'assign':
+                continue  # p. ej. parámetros ('a', 'INT_TYPE')
+            occ = len(nodes)
+            nodes.append(value)
+            parent.append(up)
+            kinds = by_kind.get(kind)
+            if kinds is None:
+                kinds = by_kind[kind] = array('i')
+            kinds.append(occ)
+            if kind == 'func':
+                # Sólo el cuerpo: los parámetros ('call', 'INT_TYPE') no son
+                # nodos aunque el nombre coincida con un tipo
+                stack.append((value[4], occ))
+            else:
+                stack.extend((v, occ) for v in reversed(value[1:]))
+
+    def __len__(self):
+        return len(self.nodes)
+
+    # Navegación
+    def ancestors(self, occ):
+        up = self.parent[occ]
+        while up != NO_PARENT:
+            yield up
+            up = self.parent[up]
+
+    def enclosing(self, occ, kind):
+        """Aparición del ancestro más cercano de ese tipo, o None"""
+        for up in self.ancestors(occ):
+            if self.nodes[up][0] == kind:
+                return up
+        return None
+
+    def of_kind(self, kind):
+        if kind == '*':
+            return range(len(self.nodes))
+        return self.by_kind.get(kind, ())
+
+    # Consultas
+    def query_ids(self, query):
+        """Apariciones que cumplen la consulta, en orden de recorrido"""
+        steps = parse_query(query) if isinstance(query, str) else query
+        first, rest = steps[0], steps[1:]
+        result = []
+        for occ in self.of_kind(first.kind):
+            if not first.matches(self.nodes[occ]):
+                continue
+            if self._check_context(occ, rest):
+                result.append(occ)
+        return result
+
+    def query(self, query):
+        return [self.nodes[occ] for occ in self.query_ids(query)]
+
+    def count(self, query):
+        return len(self.query_ids(query))
+
+    def _check_context(self, occ, rest):
+        # Cadena de 'inside': el ancestro más cercano que cumple es siempre
+        # la mejor elección para los selectores siguientes
+        current = occ
+        for negated, sel in rest:
+            found = None
+            for up in self.ancestors(current):
+                if sel.matches(self.nodes[up]):
+                    found = up
+                    break
+            if negated:
+                if found is not None:
+                    return False
+            else:
+                if found is None:
+                    return False
+                current = found
+        return True
+
+
+class Selector:
+    __slots__ = ('kind', 'conds')
+
+    def __init__(self, kind, conds):
+        self.kind = kind
+        self.conds = conds  # [(campo, negado, valor)]
+
+    def matches(self, node):
+        if self.kind != '*' and node[0] != self.kind:
+            return False
+        for name, negated, expected in self.conds:
+            if _value_matches(field_value(node, name), expected) == negated:
+                return False
+        return True
+
+
+def _value_matches(actual, expected):
+    if actual is None or isinstance(actual, (tuple, list)):
+        return False
+    if isinstance(actual, str):
+        return actual == expected or actual == OP_ALIASES.get(expected)
+    # Literales numéricos y booleanos
+    return str(actual) == expected or (isinstance(actual, bool) and str(actual).lower() == expected)
+
+
+_TOKEN_RE = re.compile(r'\s*(?:(not\s+inside|inside)\b|([A-Za-z_*][A-Za-z_0-9]*)(?:\[([^\]]*)\])?)')
+_COND_RE = re.compile(r'\s*([A-Za-z_]+)\s*(!=|=)\s*(.*?)\s*$')
+
+
+def parse_selector(kind, conds_text):
+    conds = []
+    if conds_text:
+        for part in conds_text.split(','):
+            m = _COND_RE.match(part)
+            if not m:
+                raise QueryError(f"Condición inválida: '{part.strip()}'")
+            name, op, value = m.groups()
+            conds.append((name, op == '!=', value))
+    return Selector(kind, conds)
+
+
+def parse_query(text):
+    """
+    Retorna [selector, (negado, selector), ...]
+    Lanza QueryError si la consulta no es válida.
+    """
+    pos = 0
+    steps = []
+    pending = None  # combinador leído, esperando su selector
+    text = text.rstrip()
+    while pos < len(text):
+        m = _TOKEN_RE.match(text, pos)
+        if not m or m.end() == pos:
+            raise QueryError(f"Consulta inválida cerca de '{text[pos:].strip()}'")
+        pos = m.end()
+        combinator, kind, conds = m.groups()
+        if combinator:
+            if not steps or pending is not None:
+                raise QueryError(f"'{combinator}' sin selector")
+            pending = combinator.startswith('not')
+            continue
+        selector = parse_selector(kind, conds)
+        if not steps:
+            steps.append(selector)
+        elif pending is None:
+            raise QueryError(f"Falta 'inside' antes de '{kind}'")
+        else:
+            steps.append((pending, selector))
+            pending = None
+    if not steps or pending is not None:
+        raise QueryError("Consulta incompleta")
+    return steps
+
+
+def main():
+    if len(sys.argv) < 3:
+        print("Uso: python3 astquery.py 'consulta' archivo.go [archivo.go ...]")
+        sys.exit(2)
+
+    from goYacc import parse_code
+
+    try:
+        query = parse_query(sys.argv[1])
+    except QueryError as e:
+        print(f"Error: {e}")
+        sys.exit(2)
+
+    total = 0
+    for path in sys.argv[2:]:
+        with open(path, 'r', encoding='utf-8') as f:
+            _, ast, _ = parse_code(f.read(), do_semantic=False)
+        index = AstIndex(ast)
+        for occ in index.query_ids(query):
+            total += 1
+            func = index.enclosing(occ, 'func')
+            where = f"func {index.nodes[func][1]}" if func is not None else "nivel superior"
+            print(f"{path}: [{where}] {index.nodes[occ]!r}")
+    print(f"\nCoincidencias: {total}")
+
+
+if __name__ == '__main__':
+    main()
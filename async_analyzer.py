@@ -0,0 +1,214 @@
+# async_analyzer.py - API asyncio para el analizador de Go Lite
+#
+# parse_code() y SemanticAnalyzer.analyze() bloquean (CPU + escritura del
+# log). Aquí el trabajo de CPU se envía a un executor (hilos o procesos),
+# el log se escribe fuera del event loop y un semáforo limita la cantidad
+# de análisis en curso para aplicar contrapresión.
+#
+# Con hilos, el parser y el lexer de PLY son globales del módulo, así que
+# los análisis se serializan con un lock: el event loop queda libre, pero
+# no hay paralelismo. Con procesos cada worker tiene su propio parser.
+import asyncio
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import semant
+
+EXECUTORS = ('thread', 'process')
+
+# PLY (parser, lexer y syntax_error_flag) no es reentrante
+_PARSER_LOCK = threading.Lock()
+
+
+def analyze_sync(code, do_semantic=True, git_user=None, engine='yacc', optimize=False,
+                 return_ast=True):
+    """
+    Análisis completo sin escribir el log. Se ejecuta dentro del executor.
+    Retorna un dict con syntax_ok, ast, errors y log_text. Con
+    return_ast=False el AST no se devuelve (evita serializarlo entre procesos).
+    """
+    import goYacc
+    from optimizer import fold_constants
+
+    with _PARSER_LOCK:
+        sem = semant.SemanticAnalyzer()
+        syntax_ok, ast, _ = goYacc.parse_code(code, do_semantic=False, engine=engine)
+        errors = []
+        log_text = None
+        # Igual que parse_code: el semántico sobre el AST sin optimizar
+        # (revisa también las ramas que el plegado poda) y después el plegado
+        if do_semantic and ast is not None:
+            errors = sem.analyze(ast, write_log=False)
+            log_text = sem.render_log(git_user)
+        if optimize and ast is not None:
+            ast, goYacc.last_optimization_stats = fold_constants(ast)
+    return {
+        'syntax_ok': syntax_ok,
+        'ast': ast if return_ast else None,
+        'errors': errors,
+        'log_text': log_text,
+    }
+
+
+def _write_text(path, text):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    return path
+
+
+async def _wait_quietly(future):
+    """Espera a que el trabajo termine aunque la tarea vuelva a cancelarse"""
+    while not future.done():
+        try:
+            await asyncio.wait([future])
+        except asyncio.CancelledError:
+            pass
+    if not future.cancelled():
+        future.exception()  # el resultado se descarta: evita el aviso de excepción sin leer
+
+
+class AsyncAnalyzer:
+    """
+    Uso:
+        async with AsyncAnalyzer(max_concurrency=4, executor='process') as an:
+            result = await an.analyze(code)
+    """
+    def __init__(self, max_concurrency=4, executor='thread', max_workers=None,
+                 git_user=None, write_log=True, engine='yacc', return_ast=True):
+        if executor not in EXECUTORS:
+            raise ValueError(f"executor debe ser uno de {EXECUTORS}")
+        self.max_concurrency = max_concurrency
+        self.git_user = git_user
+        self.write_log = write_log
+        self.engine = engine
+        self.return_ast = return_ast
+        workers = max_workers or max_concurrency
+        if executor == 'process':
+            self._executor = ProcessPoolExecutor(max_workers=workers)
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=workers,
+                                                thread_name_prefix='golite')
+        # Executor aparte para el log: la E/S no compite con el CPU
+        self._io_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='golite-log')
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._shutdown)
+
+    def _shutdown(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._io_executor.shutdown(wait=True)
+
+    async def analyze(self, code, do_semantic=True, optimize=False):
+        """
+        Analiza un archivo sin bloquear el event loop.
+        Si la tarea se cancela mientras espera turno o mientras el trabajo
+        está en cola del executor, no se ejecuta. Si ya estaba corriendo no
+        se puede interrumpir: el resultado se descarta, pero el lugar en el
+        semáforo sigue ocupado hasta que el trabajo termina.
+        """
+        loop = asyncio.get_running_loop()
+        async with self._semaphore:
+            self.in_flight += 1
+            job = self._executor.submit(analyze_sync, code, do_semantic, self.git_user,
+                                        self.engine, optimize, self.return_ast)
+            future = asyncio.wrap_future(job)
+            try:
+                result = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not job.cancel():
+                    await _wait_quietly(future)
+                raise
+            finally:
+                self.in_flight -= 1
+
+        log_text = result.pop('log_text')
+        result['log_file'] = None
+        if self.write_log and log_text is not None:
+            # Nombre único: en lote varios logs terminan en el mismo minuto
+            path = os.path.join(semant.LOGS_DIR,
+                                semant.make_log_filename(self.git_user, unique=True))
+            result['log_file'] = await loop.run_in_executor(
+                self._io_executor, _write_text, path, log_text)
+        return result
+
+    async def analyze_many(self, sources, queue_size=None, do_semantic=True):
+        """
+        Generador asíncrono sobre un iterable (o iterable asíncrono) de
+        (nombre, código).
+        Produce (nombre, resultado) en orden de finalización. La cola de
+        entrada está acotada: no se leen más fuentes de las que se pueden
+        procesar (contrapresión).
+        """
+        queue = asyncio.Queue(maxsize=queue_size or self.max_concurrency * 2)
+        results = asyncio.Queue(maxsize=self.max_concurrency)
+        done_marker = object()
+
+        async def producer():
+            if hasattr(sources, '__aiter__'):
+                async for item in sources:
+                    await queue.put(item)
+            else:
+                for item in sources:
+                    await queue.put(item)
+            for _ in range(self.max_concurrency):
+                await queue.put(done_marker)
+
+        async def worker():
+            while True:
+                item = await queue.get()
+                if item is done_marker:
+                    await results.put(done_marker)
+                    return
+                name, code = item
+                try:
+                    result = await self.analyze(code, do_semantic)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    result = {'syntax_ok': False, 'ast': None, 'errors': [],
+                              'exception': repr(e)}
+                await results.put((name, result))
+
+        tasks = [asyncio.create_task(producer())]
+        tasks += [asyncio.create_task(worker()) for _ in range(self.max_concurrency)]
+        try:
+            finished = 0
+            while finished < self.max_concurrency:
+                item = await results.get()
+                if item is done_marker:
+                    finished += 1
+                    continue
+                yield item
+        finally:
+            # Cancelación (o salida anticipada del consumidor): detener todo
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def analyze_files(paths, **kwargs):
+    """Atajo: analiza una lista de archivos y retorna {ruta: resultado}"""
+    def read(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    async def sources():
+        loop = asyncio.get_running_loop()
+        for p in paths:
+            yield (str(p), await loop.run_in_executor(None, read, p))
+
+    out = {}
+    async with AsyncAnalyzer(**kwargs) as analyzer:
+        async for name, result in analyzer.analyze_many(sources()):
+            out[name] = result
+    return out
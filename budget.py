@@ -0,0 +1,325 @@
+# budget.py - Límites por archivo (tiempo, tokens, tamaño del AST y memoria)
+#
+# Un archivo patológico (comentario enorme, anidamiento profundo, cascada de
+# errores en p_error) no debe detener un lote completo. El análisis se
+# cancela en cuanto se supera un límite y se reporta como un resultado
+# estructurado con la fase en la que estaba.
+import argparse
+import multiprocessing
+import queue as queue_mod
+import sys
+import time
+import tracemalloc
+
+from hashcons import plain_node
+
+PHASE_SYNTAX = 'sintactico'
+PHASE_SEMANTIC = 'semantico'
+
+
+class BudgetExceeded(Exception):
+    """Se superó uno de los límites de AnalysisBudget"""
+    def __init__(self, phase, limit, max_value, value):
+        self.phase = phase
+        self.limit = limit
+        self.max_value = max_value
+        self.value = value
+        super().__init__(
+            f"Presupuesto excedido en fase {phase}: {limit} = {value} (máximo {max_value})"
+        )
+
+    def as_result(self):
+        return {
+            'status': 'budget_exceeded',
+            'phase': self.phase,
+            'limit': self.limit,
+            'max': self.max_value,
+            'value': self.value,
+            'message': str(self),
+        }
+
+
+class AnalysisBudget:
+    """
+    Límites de un análisis. Cualquier límite en None no se verifica.
+    La memoria se mide con tracemalloc (sólo se activa si hay max_memory_mb).
+    """
+    def __init__(self, max_seconds=None, max_tokens=None, max_ast_nodes=None,
+                 max_memory_mb=None, check_every=256):
+        self.max_seconds = max_seconds
+        self.max_tokens = max_tokens
+        self.max_ast_nodes = max_ast_nodes
+        self.max_memory_mb = max_memory_mb
+        self.check_every = check_every
+
+        self.phase = None
+        self.tokens = 0
+        self.ast_nodes = 0
+        self.started = None
+        self._ticks = 0
+        self._started_tracemalloc = False
+        self._mem_base = 0
+
+    def start(self, phase=PHASE_SYNTAX):
+        self.phase = phase
+        self.tokens = 0
+        self.ast_nodes = 0
+        self._ticks = 0
+        self.started = time.perf_counter()
+        if self.max_memory_mb is not None:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracemalloc = True
+            self._mem_base = tracemalloc.get_traced_memory()[0]
+
+    def stop(self):
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def elapsed(self):
+        return time.perf_counter() - self.started if self.started is not None else 0.0
+
+    def memory_mb(self):
+        if not tracemalloc.is_tracing():
+            return 0.0
+        return (tracemalloc.get_traced_memory()[0] - self._mem_base) / (1024 * 1024)
+
+    def check(self):
+        """Verifica tiempo y memoria (lanza BudgetExceeded)"""
+        if self.max_seconds is not None:
+            elapsed = self.elapsed()
+            if elapsed > self.max_seconds:
+                raise BudgetExceeded(self.phase, 'segundos', self.max_seconds, round(elapsed, 3))
+        if self.max_memory_mb is not None:
+            used = self.memory_mb()
+            if used > self.max_memory_mb:
+                raise BudgetExceeded(self.phase, 'memoria_mb', self.max_memory_mb, round(used, 2))
+
+    def tick(self):
+        """Verificación barata para bucles calientes: check() cada check_every llamadas"""
+        self._ticks += 1
+        if self._ticks >= self.check_every:
+            self._ticks = 0
+            self.check()
+
+    def count_token(self):
+        self.tokens += 1
+        if self.max_tokens is not None and self.tokens > self.max_tokens:
+            raise BudgetExceeded(self.phase, 'tokens', self.max_tokens, self.tokens)
+        self.tick()
+
+    def count_node(self):
+        self.ast_nodes += 1
+        if self.max_ast_nodes is not None and self.ast_nodes > self.max_ast_nodes:
+            raise BudgetExceeded(self.phase, 'nodos_ast', self.max_ast_nodes, self.ast_nodes)
+
+    def node_factory(self, make_node=plain_node):
+        """
+        Constructor de nodos para las acciones del parser que cuenta cada
+        nodo: el análisis se cancela apenas se construye uno de más, no
+        después de armar el AST completo.
+        """
+        def node(*fields):
+            self.count_node()
+            return make_node(*fields)
+        return node
+
+
+class BudgetedLexer:
+    """Envuelve un lexer de PLY y consume presupuesto por cada token"""
+    def __init__(self, lexer, budget):
+        self.lexer = lexer
+        self.budget = budget
+
+    def input(self, code):
+        self.lexer.input(code)
+
+    def token(self):
+        tok = self.lexer.token()
+        if tok is not None:
+            self.budget.count_token()
+        return tok
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        tok = self.token()
+        if tok is None:
+            raise StopIteration
+        return tok
+
+    def __getattr__(self, name):
+        return getattr(self.lexer, name)
+
+
+def analyze_with_budget(code, budget, do_semantic=True, git_user=None, engine='yacc'):
+    """
+    Ejecuta el análisis sintáctico y semántico dentro del presupuesto.
+    Retorna un dict con 'status' = 'ok' o 'budget_exceeded'.
+    """
+    import goYacc
+    import semant
+    from golex import lexer
+
+    if git_user:
+        semant.GIT_USER = git_user
+
+    budget.start(PHASE_SYNTAX)
+    try:
+        guarded = BudgetedLexer(lexer, budget)
+        node = budget.node_factory()
+        goYacc.syntax_error_flag = False
+        try:
+            if engine == 'rd':
+                ast, syntax_ok = goYacc.rdparser.parse(code, guarded, make_node=node)
+            else:
+                goYacc.make_node = node
+                try:
+                    ast = goYacc.parser.parse(code, lexer=guarded)
+                finally:
+                    goYacc.make_node = plain_node
+                syntax_ok = not goYacc.syntax_error_flag
+        except RecursionError:
+            raise BudgetExceeded(budget.phase, 'profundidad', sys.getrecursionlimit(), 'recursión agotada')
+
+        budget.check()
+
+        sem_errors = []
+        log_file = None
+        if do_semantic and ast is not None:
+            budget.phase = PHASE_SEMANTIC
+            sem = semant.SemanticAnalyzer(budget=budget)
+            try:
+                sem_errors = sem.analyze(ast, write_log=False)
+            except RecursionError:
+                raise BudgetExceeded(budget.phase, 'profundidad', sys.getrecursionlimit(), 'recursión agotada')
+            # Nombre único: en un lote varios archivos terminan en el mismo minuto
+            log_file = sem.save_log(unique=True)
+
+        return {
+            'status': 'ok',
+            'syntax_ok': syntax_ok,
+            'ast': ast,
+            'errors': sem_errors,
+            'log_file': log_file,
+            'tokens': budget.tokens,
+            'ast_nodes': budget.ast_nodes,
+            'seconds': round(budget.elapsed(), 3),
+        }
+    except BudgetExceeded as e:
+        return e.as_result()
+    finally:
+        budget.stop()
+
+
+# Lotes de archivos
+def _analyze_file(path, limits, do_semantic, git_user):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            code = f.read()
+    except OSError as e:
+        return {'status': 'error', 'message': str(e)}
+    result = analyze_with_budget(code, AnalysisBudget(**limits), do_semantic, git_user)
+    result.pop('ast', None)
+    return result
+
+
+def _isolated_worker(path, limits, do_semantic, git_user, queue):
+    queue.put(_analyze_file(path, limits, do_semantic, git_user))
+
+
+def _wait_result(proc, queue, timeout, poll=0.5):
+    """
+    Resultado del proceso hijo, o None si se agotó el timeout (el hijo
+    sigue vivo) o si el hijo terminó sin enviar nada.
+    """
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    while True:
+        wait = poll
+        if deadline is not None:
+            wait = min(poll, deadline - time.monotonic())
+            if wait <= 0:
+                return None
+        try:
+            return queue.get(timeout=wait)
+        except queue_mod.Empty:
+            if not proc.is_alive():
+                # Lo que haya puesto antes de salir ya está en el pipe
+                try:
+                    return queue.get(timeout=poll)
+                except queue_mod.Empty:
+                    return None
+
+
+def run_batch(paths, limits=None, do_semantic=True, git_user=None, isolate=False):
+    """
+    Analiza varios archivos, cada uno con su propio presupuesto.
+    Con isolate=True cada archivo corre en un proceso aparte que se termina
+    si excede max_seconds (cubre bloqueos dentro de código C, p. ej. una
+    regex del lexer, donde no hay puntos de verificación).
+    Retorna una lista de (ruta, resultado).
+    """
+    limits = limits or {}
+    results = []
+    for path in paths:
+        path = str(path)
+        if not isolate:
+            results.append((path, _analyze_file(path, limits, do_semantic, git_user)))
+            continue
+
+        queue = multiprocessing.Queue()
+        proc = multiprocessing.Process(
+            target=_isolated_worker, args=(path, limits, do_semantic, git_user, queue)
+        )
+        proc.start()
+        max_seconds = limits.get('max_seconds')
+        # Margen para que el propio proceso reporte el exceso antes de matarlo
+        timeout = max_seconds * 2 + 1 if max_seconds is not None else None
+        # El resultado se lee antes del join: un resultado más grande que el
+        # buffer del pipe deja al hijo bloqueado en put() hasta que alguien lo lea
+        result = _wait_result(proc, queue, timeout)
+        if result is None and proc.is_alive():
+            proc.terminate()
+            result = BudgetExceeded('desconocida', 'segundos', max_seconds, None).as_result()
+        proc.join()
+        if result is None:
+            result = {'status': 'error', 'message': f'proceso terminó con código {proc.exitcode}'}
+        results.append((path, result))
+    return results
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Análisis por lotes con límites por archivo")
+    ap.add_argument('archivos', nargs='+', help='Archivos .go')
+    ap.add_argument('--max-seconds', type=float, default=None)
+    ap.add_argument('--max-tokens', type=int, default=None)
+    ap.add_argument('--max-ast-nodes', type=int, default=None)
+    ap.add_argument('--max-memory-mb', type=float, default=None)
+    ap.add_argument('--user', default=None, help='Usuario Git para el log semántico')
+    ap.add_argument('--isolate', action='store_true', help='Un proceso por archivo')
+    args = ap.parse_args()
+
+    limits = {
+        'max_seconds': args.max_seconds,
+        'max_tokens': args.max_tokens,
+        'max_ast_nodes': args.max_ast_nodes,
+        'max_memory_mb': args.max_memory_mb,
+    }
+    exceeded = 0
+    for path, result in run_batch(args.archivos, limits, git_user=args.user, isolate=args.isolate):
+        if result['status'] == 'ok':
+            state = 'OK' if result['syntax_ok'] else 'ERRORES SINTÁCTICOS'
+            print(f"{path}: {state}, {len(result['errors'])} error(es) semántico(s), "
+                  f"{result['tokens']} tokens, {result['seconds']}s")
+        elif result['status'] == 'budget_exceeded':
+            exceeded += 1
+            print(f"{path}: PRESUPUESTO EXCEDIDO - {result['message']}")
+        else:
+            print(f"{path}: ERROR - {result['message']}")
+    print(f"\nArchivos: {len(args.archivos)}, con presupuesto excedido: {exceeded}")
+
+
+if __name__ == '__main__':
+    main()
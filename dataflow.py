@@ -0,0 +1,333 @@
+# dataflow.py - Grafo de flujo de control y análisis de flujo de datos
+#
+# Para cada función se arma un CFG de bloques básicos (los if/else abren
+# ramas que se juntan en un bloque de salida) y se resuelven dos problemas
+# clásicos gen/kill con bitsets (un int de Python, un bit por variable):
+#
+#   asignación definitiva (hacia adelante, intersección)
+#       -> uso de una variable posiblemente sin asignar
+#   variables vivas (hacia atrás, unión)
+#       -> valores asignados que nunca se leen
+#
+# Además se reportan las variables declaradas que nunca se leen. Cada
+# función se recorre una vez para armar el CFG y los bloques se iteran
+# hasta el punto fijo con una cola de trabajo, así que el costo es lineal
+# en el tamaño de la función (sin ciclos en Go Lite basta una pasada por
+# dirección).
+#
+# Limitación: en el AST los identificadores y los literales string son
+# ambos str, así que un string igual al nombre de una variable visible se
+# cuenta como lectura de esa variable.
+
+from collections import deque
+
+# Tipos de sentencia simple dentro de un bloque
+S_DECL = 'decl'        # var x T           (declara, no asigna)
+S_DEF = 'def'          # var x T = e, x := e, x = e
+S_UPDATE = 'update'    # x op= e           (lee y asigna)
+S_USE = 'use'          # expresión suelta o condición de un if
+
+# La lectura de x en `x op= e` no va en la máscara de la sentencia: cuenta
+# para la asignación definitiva y para la vida del valor anterior, pero no
+# como uso (como go vet, una variable que sólo se actualiza no se usa).
+
+
+class Variable:
+    __slots__ = ('slot', 'name', 'kind')
+
+    def __init__(self, slot, name, kind):
+        self.slot = slot
+        self.name = name
+        self.kind = kind  # 'param', 'var' o 'short'
+
+
+class Block:
+    __slots__ = ('id', 'stmts', 'succs', 'preds')
+
+    def __init__(self, block_id):
+        self.id = block_id
+        self.stmts = []   # (tipo, slot o -1, máscara de lecturas sin el propio x de S_UPDATE)
+        self.succs = []
+        self.preds = []
+
+
+class FunctionCFG:
+    """CFG de una función con sus variables numeradas por slot"""
+    def __init__(self, name):
+        self.name = name
+        self.blocks = []
+        self.variables = []
+        self.params_mask = 0
+        self.entry = self.new_block()
+        self.exit = None
+
+    def new_block(self):
+        block = Block(len(self.blocks))
+        self.blocks.append(block)
+        return block
+
+    def new_variable(self, name, kind):
+        var = Variable(len(self.variables), name, kind)
+        self.variables.append(var)
+        return var.slot
+
+    @staticmethod
+    def link(a, b):
+        a.succs.append(b)
+        b.preds.append(a)
+
+
+class _Builder:
+    """Arma el CFG resolviendo los nombres con ámbitos por bloque if/else"""
+    def __init__(self, func):
+        _, name, params, _, body = func
+        self.cfg = FunctionCFG(name)
+        self.scopes = [{}]
+        for pname, _ in params:
+            slot = self.cfg.new_variable(pname, 'param')
+            self.scopes[-1][pname] = slot
+            self.cfg.params_mask |= 1 << slot
+        self.current = self.cfg.entry
+        self.statements(body)
+        self.cfg.exit = self.current
+
+    def lookup(self, name):
+        for scope in reversed(self.scopes):
+            slot = scope.get(name)
+            if slot is not None:
+                return slot
+        return None
+
+    def reads(self, expr):
+        """Máscara de las variables que lee una expresión"""
+        mask = 0
+        stack = [expr]
+        while stack:
+            e = stack.pop()
+            if isinstance(e, str):
+                slot = self.lookup(e)
+                if slot is not None:
+                    mask |= 1 << slot
+            elif isinstance(e, tuple) and e:
+                kind = e[0]
+                if kind == 'binop':
+                    stack.append(e[2])
+                    stack.append(e[3])
+                elif kind == 'unary':
+                    stack.append(e[2])
+                elif kind == 'call':
+                    stack.extend(e[3])
+            elif isinstance(e, list):
+                stack.extend(e)
+        return mask
+
+    def declare(self, name, kind):
+        slot = self.cfg.new_variable(name, kind)
+        self.scopes[-1][name] = slot
+        return slot
+
+    def statements(self, stmts):
+        for stmt in stmts or ():
+            self.statement(stmt)
+
+    def statement(self, stmt):
+        if not isinstance(stmt, tuple) or not stmt:
+            return
+        kind = stmt[0]
+        emit = self.current.stmts.append
+
+        if kind == 'var':
+            uses = self.reads(stmt[3]) if stmt[3] is not None else 0
+            slot = self.declare(stmt[1], 'var')
+            emit((S_DEF if stmt[3] is not None else S_DECL, slot, uses))
+        elif kind == 'declare_short':
+            uses = self.reads(stmt[2])
+            emit((S_DEF, self.declare(stmt[1], 'short'), uses))
+        elif kind == 'assign':
+            if len(stmt) == 4:
+                # ('assign', op, nombre, expr): x op= e también lee x
+                slot = self.lookup(stmt[2])
+                uses = self.reads(stmt[3])
+                if slot is None:
+                    emit((S_USE, -1, uses))
+                else:
+                    emit((S_UPDATE, slot, uses))
+            else:
+                slot = self.lookup(stmt[1])
+                emit((S_DEF if slot is not None else S_USE,
+                      slot if slot is not None else -1, self.reads(stmt[2])))
+        elif kind == 'if':
+            emit((S_USE, -1, self.reads(stmt[1])))
+            cond_block = self.current
+            ends = []
+            for branch in (stmt[2], stmt[3]):
+                if branch is None:
+                    ends.append(cond_block)
+                    continue
+                block = self.cfg.new_block()
+                FunctionCFG.link(cond_block, block)
+                self.current = block
+                self.scopes.append({})
+                self.statements(branch)
+                self.scopes.pop()
+                ends.append(self.current)
+            join = self.cfg.new_block()
+            for end in ends:
+                FunctionCFG.link(end, join)
+            self.current = join
+        elif kind == 'block':
+            # Rama que quedó de un if podado por optimizer.py
+            self.scopes.append({})
+            self.statements(stmt[1])
+            self.scopes.pop()
+        elif kind != 'empty_stmt':
+            emit((S_USE, -1, self.reads(stmt)))
+
+
+def build_cfg(func):
+    """CFG de un nodo ('func', nombre, params, ret, cuerpo)"""
+    return _Builder(func).cfg
+
+
+# Ecuaciones por bloque
+def _value_reads(kind, slot, reads):
+    """Lecturas de la sentencia incluido el valor anterior que lee x op= e"""
+    return reads | (1 << slot) if kind == S_UPDATE else reads
+
+
+def _block_assigned(block):
+    gen = 0
+    for kind, slot, _ in block.stmts:
+        if kind in (S_DEF, S_UPDATE):
+            gen |= 1 << slot
+    return gen
+
+
+def _block_use_def(block):
+    """Lecturas expuestas hacia arriba y asignaciones de un bloque"""
+    use = defs = 0
+    for kind, slot, reads in block.stmts:
+        use |= _value_reads(kind, slot, reads) & ~defs
+        if kind in (S_DEF, S_UPDATE):
+            defs |= 1 << slot
+    return use, defs
+
+
+def definitely_assigned(cfg):
+    """IN[b]: variables asignadas en todos los caminos hasta b (hacia adelante)"""
+    full = (1 << len(cfg.variables)) - 1
+    gen = [_block_assigned(b) for b in cfg.blocks]
+    out = [full] * len(cfg.blocks)
+    inn = [0] * len(cfg.blocks)
+    work = deque(cfg.blocks)
+    queued = [True] * len(cfg.blocks)
+    while work:
+        block = work.popleft()
+        queued[block.id] = False
+        if block is cfg.entry:
+            new_in = cfg.params_mask
+        else:
+            new_in = full
+            for p in block.preds:
+                new_in &= out[p.id]
+        inn[block.id] = new_in
+        new_out = new_in | gen[block.id]
+        if new_out != out[block.id]:
+            out[block.id] = new_out
+            for s in block.succs:
+                if not queued[s.id]:
+                    queued[s.id] = True
+                    work.append(s)
+    return inn
+
+
+def live_variables(cfg):
+    """OUT[b]: variables que se leen más adelante en algún camino (hacia atrás)"""
+    use_def = [_block_use_def(b) for b in cfg.blocks]
+    inn = [0] * len(cfg.blocks)
+    out = [0] * len(cfg.blocks)
+    work = deque(reversed(cfg.blocks))
+    queued = [True] * len(cfg.blocks)
+    while work:
+        block = work.popleft()
+        queued[block.id] = False
+        new_out = 0
+        for s in block.succs:
+            new_out |= inn[s.id]
+        out[block.id] = new_out
+        use, defs = use_def[block.id]
+        new_in = use | (new_out & ~defs)
+        if new_in != inn[block.id]:
+            inn[block.id] = new_in
+            for p in block.preds:
+                if not queued[p.id]:
+                    queued[p.id] = True
+                    work.append(p)
+    return out
+
+
+def _names(cfg, mask):
+    slot = 0
+    while mask:
+        if mask & 1:
+            yield cfg.variables[slot].name
+        mask >>= 1
+        slot += 1
+
+
+def analyze_function(func):
+    """Retorna la lista de advertencias de una función"""
+    cfg = build_cfg(func)
+    fname = cfg.name
+    warnings = []
+
+    # Variables que se usan en algún punto de la función (x op= e no es un uso de x)
+    read_anywhere = 0
+    for block in cfg.blocks:
+        for _, _, reads in block.stmts:
+            read_anywhere |= reads
+    for var in cfg.variables:
+        if var.kind != 'param' and not read_anywhere >> var.slot & 1:
+            warnings.append(
+                f"ADVERTENCIA: Variable '{var.name}' declarada y no usada (función '{fname}')")
+
+    assigned_in = definitely_assigned(cfg)
+    live_out = live_variables(cfg)
+    for block in cfg.blocks:
+        # Hacia adelante: asignación definitiva sentencia por sentencia
+        assigned = assigned_in[block.id]
+        for kind, slot, reads in block.stmts:
+            reads = _value_reads(kind, slot, reads)
+            for name in _names(cfg, reads & ~assigned):
+                warnings.append(
+                    f"ADVERTENCIA: Variable '{name}' posiblemente usada antes de "
+                    f"asignarle un valor (función '{fname}')")
+            assigned |= reads  # reportar una sola vez por camino
+            if kind in (S_DEF, S_UPDATE):
+                assigned |= 1 << slot
+
+        # Hacia atrás: asignaciones cuyo valor nunca se lee
+        live = live_out[block.id]
+        dead = []
+        for kind, slot, reads in reversed(block.stmts):
+            if kind in (S_DEF, S_UPDATE):
+                bit = 1 << slot
+                if not live & bit and read_anywhere & bit:
+                    dead.append(cfg.variables[slot].name)
+                live &= ~bit
+            live |= _value_reads(kind, slot, reads)
+        for name in reversed(dead):
+            warnings.append(
+                f"ADVERTENCIA: El valor asignado a '{name}' nunca se lee (función '{fname}')")
+    return warnings
+
+
+def analyze_program(ast):
+    """Advertencias de flujo de datos de todas las funciones del programa"""
+    warnings = []
+    if not isinstance(ast, tuple) or ast[0] != 'program':
+        return warnings
+    for top in ast[1]:
+        if isinstance(top, tuple) and top[0] == 'func':
+            warnings.extend(analyze_function(top))
+    return warnings
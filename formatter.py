@@ -0,0 +1,286 @@
+# formatter.py - Formateador en streaming para fuentes Go Lite
+#
+# El parser descarta los comentarios (t_COMMENT_LINE / t_COMMENT_BLOCK) y
+# los ';' (p_semi_optional), así que el formateador no usa el AST: trabaja
+# sobre un flujo de tokens propio en el que comentarios y saltos de línea
+# se conservan como trivia. El flujo sale de la misma expresión regular
+# maestra que arma PLY para golex, así que los tokens son exactamente los
+# del lexer.
+#
+# La entrada se lee línea por línea y la salida se escribe línea por línea:
+# en memoria sólo quedan la línea actual y, como mucho, un raw string o un
+# comentario de bloque que abarque varias líneas.
+#
+# Reglas (al estilo gofmt):
+#   - sangría con tabs según la profundidad de llaves
+#   - una sentencia por línea: los ';' se convierten en salto de línea
+#   - '{' al final de la línea, '}' en su propia línea, '} else {' junto
+#   - espacios alrededor de operadores binarios y asignaciones, ninguno
+#     después de un operador unario, antes de ',' / ')' o alrededor de '.'
+#   - como máximo una línea en blanco seguida; sin espacios al final
+import argparse
+import os
+import re
+import shutil
+import sys
+import tempfile
+
+import golex
+
+# Expresión regular maestra de golex (la misma que usa el lexer de PLY)
+_MASTER_RE = re.compile('|'.join(golex.lexer.lexretext), golex.lexer.lexreflags)
+
+COMMENT = 'COMMENT'
+NEWLINE = 'NEWLINE'
+ILLEGAL = 'ILLEGAL'
+
+BINARY_OPS = frozenset((
+    'PLUS', 'MINUS', 'TIMES', 'DIVIDE', 'MODULO', 'BIT_OR', 'BIT_XOR', 'AND_NOT',
+    'LSHIFT', 'RSHIFT', 'EQ', 'NE', 'LT', 'LE', 'GT', 'GE', 'AND', 'OR',
+    'ASSIGN', 'DECLARE_ASSIGN', 'OR_ASSIGN', 'XOR_ASSIGN', 'AND_ASSIGN',
+    'LSHIFT_ASSIGN', 'RSHIFT_ASSIGN', 'MOD_ASSIGN', 'PLUS_ASSIGN', 'MINUS_ASSIGN',
+    'TIMES_ASSIGN', 'DIVIDE_ASSIGN',
+))
+UNARY_OPS = frozenset(('MINUS', 'NOT', 'AMPERSAND'))
+KEYWORDS = frozenset(golex.reserved.values())
+# Después de estos tokens un '-', '!' o '&' es unario
+_UNARY_CONTEXT = BINARY_OPS | KEYWORDS | {'LPAREN', 'LBRACKET', 'COMMA', 'LBRACE', 'NOT',
+                                           'AMPERSAND', None}
+_NO_SPACE_BEFORE = frozenset(('COMMA', 'RPAREN', 'RBRACKET', 'SEMI', 'DOT'))
+_NO_SPACE_AFTER = frozenset(('LPAREN', 'LBRACKET', 'DOT'))
+
+
+def scan(lines):
+    """
+    Tokeniza un iterable de líneas (cada una con su '\\n').
+    Produce (tipo, texto): los tipos de golex, COMMENT, NEWLINE (el texto
+    son los saltos de línea) e ILLEGAL.
+    """
+    buf = ''
+    lines = iter(lines)
+    eof = False
+    while not eof:
+        line = next(lines, None)
+        if line is None:
+            eof = True
+            if not buf:
+                break
+        else:
+            buf += line
+
+        pos = 0
+        end = len(buf)
+        while pos < end:
+            c = buf[pos]
+            if c in ' \t\r':
+                pos += 1
+                continue
+            # Raw string o comentario de bloque sin cerrar: pedir más líneas
+            if not eof and ((c == '`' and buf.find('`', pos + 1) < 0) or
+                            (buf.startswith('/*', pos) and buf.find('*/', pos + 2) < 0)):
+                break
+            m = _MASTER_RE.match(buf, pos)
+            if m is None:
+                yield (ILLEGAL, c)
+                pos += 1
+                continue
+            text = m.group()
+            name = m.lastgroup[2:]
+            if name == 'ID':
+                yield (golex.reserved.get(text, 'ID'), text)
+            elif name in ('COMMENT_BLOCK', 'COMMENT_LINE'):
+                yield (COMMENT, text)
+            elif name == 'newline':
+                yield (NEWLINE, text)
+            else:
+                yield (name, text)
+            pos = m.end()
+        buf = buf[pos:]
+
+
+class _Writer:
+    """Arma la línea actual y la escribe apenas termina"""
+    def __init__(self, out):
+        self.out = out
+        self.parts = []
+        self.indent = 0
+        self.wrote_any = False
+        self.last_blank = True
+
+    def empty(self):
+        return not self.parts
+
+    def add(self, text, space):
+        if not self.parts:
+            self.parts.append('\t' * self.indent)
+        elif space:
+            self.parts.append(' ')
+        self.parts.append(text)
+
+    def end_line(self):
+        if self.parts:
+            self.out.write(''.join(self.parts).rstrip() + '\n')
+            self.parts = []
+            self.wrote_any = True
+            self.last_blank = False
+
+    def blank_line(self):
+        if self.wrote_any and not self.last_blank:
+            self.out.write('\n')
+            self.last_blank = True
+
+
+def _space_between(prev, prev_unary, cur):
+    if prev is None:
+        return False
+    if cur in _NO_SPACE_BEFORE or prev in _NO_SPACE_AFTER or prev_unary:
+        return False
+    if cur == 'LPAREN' and prev == 'ID':
+        return False  # llamada o declaración de función
+    if cur == 'LBRACKET' and prev == 'ID':
+        return False
+    return True
+
+
+def _glues(left, right):
+    """True si al juntar los dos textos el lexer leería otros tokens"""
+    joined = left + right
+    m = _MASTER_RE.match(joined)
+    if m is None or m.end() != len(left):
+        return True
+    return left[-1:] == '-' and right[:1] == '-'  # '--' en Go es decremento
+
+
+def format_stream(lines, out):
+    """Formatea las líneas de entrada y escribe el resultado en out"""
+    w = _Writer(out)
+    depth = 0
+    parens = 0
+    prev = None          # tipo del último token en la línea actual
+    prev_unary = False
+    prev_text = ''
+    last_type = None     # último token significativo (sin trivia)
+    newline = False      # cortar la línea antes del próximo token
+    blank = False        # además, dejar una línea en blanco
+    nl_run = 0           # saltos de línea seguidos en la fuente (0: misma línea)
+
+    for ttype, text in scan(lines):
+        if ttype == NEWLINE:
+            nl_run += len(text)
+            newline = True
+            if nl_run > 1:
+                blank = True
+            continue
+        same_line = nl_run == 0
+        nl_run = 0
+
+        if ttype == 'SEMI' and not parens:
+            newline = True
+            continue
+        if ttype == COMMENT and text.startswith('//') and same_line and not w.empty():
+            w.add(text, True)  # comentario al final de la línea
+            newline = True
+            continue
+        if ttype == 'ELSE' and last_type == 'RBRACE':
+            newline = blank = False
+        elif ttype == 'RBRACE':
+            depth = max(depth - 1, 0)
+            newline = True
+
+        if newline:
+            w.end_line()
+            if blank:
+                w.blank_line()
+            newline = blank = False
+            prev = None
+        if w.empty():
+            w.indent = depth + (1 if parens and ttype != 'RPAREN' else 0)
+
+        if ttype == COMMENT:
+            w.add(text, prev is not None)
+            prev, prev_unary = COMMENT, False
+            newline = text.startswith('//')
+            continue
+
+        unary = ttype in UNARY_OPS and last_type in _UNARY_CONTEXT
+        space = _space_between(prev, prev_unary, ttype)
+        if not space and prev is not None and _glues(prev_text, text):
+            space = True  # p. ej. '- -1' no debe quedar como '--1'
+        w.add(text, space)
+        prev, prev_unary, last_type, prev_text = ttype, unary, ttype, text
+
+        if ttype == 'LPAREN':
+            parens += 1
+        elif ttype == 'RPAREN':
+            parens = max(parens - 1, 0)
+        elif ttype == 'LBRACE':
+            depth += 1
+            newline = True
+        elif ttype == 'RBRACE':
+            newline = True
+
+    w.end_line()
+
+
+def format_code(code):
+    """Formatea un string completo (para pruebas y archivos chicos)"""
+    import io
+    out = io.StringIO()
+    format_stream(code.splitlines(keepends=True), out)
+    return out.getvalue()
+
+
+def format_file(path, in_place=False, out=None):
+    """
+    Formatea un archivo. Con in_place=True se escribe a un temporal en el
+    mismo directorio y se reemplaza el original al terminar.
+    Retorna True si el contenido cambió (sólo con in_place).
+    """
+    with open(path, 'r', encoding='utf-8', newline='') as src:
+        if not in_place:
+            format_stream(src, out or sys.stdout)
+            return False
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.fmt')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8', newline='\n') as dst:
+                format_stream(src, dst)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    with open(path, 'rb') as a, open(tmp, 'rb') as b:
+        changed = _differs(a, b)
+    if changed:
+        # mkstemp crea el temporal con modo 0600: conservar los permisos del original
+        shutil.copymode(path, tmp)
+        os.replace(tmp, path)
+    else:
+        os.unlink(tmp)
+    return changed
+
+
+def _differs(a, b, chunk=1 << 16):
+    while True:
+        x, y = a.read(chunk), b.read(chunk)
+        if x != y:
+            return True
+        if not x:
+            return False
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Formateador de Go Lite")
+    ap.add_argument('archivos', nargs='+', help='Archivos .go')
+    ap.add_argument('-w', '--write', action='store_true',
+                    help='Reescribir los archivos en lugar de imprimir')
+    args = ap.parse_args()
+
+    for path in args.archivos:
+        if args.write:
+            if format_file(path, in_place=True):
+                print(f"formateado: {path}")
+        else:
+            format_file(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,6 +3,9 @@
 import ply.yacc as yacc
 from golex import tokens, lexer
 from semant import SemanticAnalyzer
+from optimizer import fold_constants, new_stats
+from hashcons import plain_node
+import rdparser
 
 precedence = (
     ('left', 'OR'),
@@ -15,16 +18,30 @@ precedence = (
 
 syntax_error_flag = False
 
+# Estadísticas del último plegado de constantes (parse_code con optimize=True)
+last_optimization_stats = None
+
+# Constructor de nodos de las acciones; parse_code(hashcons=...) lo cambia
+# por HashConsFactory.node mientras dura el parseo
+make_node = plain_node
+
+# parse_code(stream=True u on_declaration=...) instala aquí una función
+# que recibe cada declaración de nivel superior apenas se reduce y retorna
+# el nodo a conservar en el AST (o None para descartarlo)
+top_declaration_hook = None
+
 
 #   REGLAS DEL PARSER
 def p_program(p):
     """program : top_declaration_list"""
-    p[0] = ('program', p[1])
+    p[0] = make_node('program', p[1])
 
 def p_top_declaration_list(p):
     """top_declaration_list : top_declaration top_declaration_list
                              | top_declaration"""
-    p[0] = [p[1]] + p[2] if len(p) == 3 else [p[1]]
+    # None: declaración ya analizada y descartada en modo streaming
+    rest = p[2] if len(p) == 3 else []
+    p[0] = [p[1]] + rest if p[1] is not None else rest
 
 def p_top_declaration(p):
     """
@@ -33,11 +50,13 @@ def p_top_declaration(p):
                     | FUNC ID LPAREN param_list RPAREN func_return LBRACE statement_list RBRACE
     """
     if p[1] == 'package':
-        p[0] = ('package', p[2])
+        p[0] = make_node('package', p[2])
     elif p[1] == 'import':
-        p[0] = ('import', p[2])
+        p[0] = make_node('import', p[2])
     elif p[1] == 'func':
-        p[0] = ('func', p[2], p[4], p[6], p[8])
+        p[0] = make_node('func', p[2], p[4], p[6], p[8])
+    if top_declaration_hook is not None:
+        p[0] = top_declaration_hook(p[0])
 
 def p_func_return(p):
     """func_return : type_spec
@@ -57,7 +76,7 @@ def p_param_list(p):
 
 def p_param(p):
     """param : ID type_spec"""
-    p[0] = (p[1], p[2])
+    p[0] = make_node(p[1], p[2])
 
 def p_statement_list(p):
     """statement_list : statement statement_list
@@ -82,7 +101,7 @@ def p_statement(p):
     if len(p) == 2:
         if p.slice[1].type == 'SEMI':
             # statement : SEMI  -> statement vacío
-            p[0] = ('empty_stmt',)
+            p[0] = make_node('empty_stmt')
         else:
             # statement : control_structure
             # (if, for, etc.) simplemente devolvemos el nodo del if/for
@@ -103,18 +122,18 @@ def p_statement(p):
     elif len(p) == 5:
         if p.slice[1].type == 'VAR':
             # VAR ID type_spec SEMI_OPTIONAL
-            p[0] = ('var', p[2], p[3], None)
+            p[0] = make_node('var', p[2], p[3], None)
         elif p.slice[2].type == 'DECLARE_ASSIGN':
             # ID DECLARE_ASSIGN expression SEMI_OPTIONAL
-            p[0] = ('declare_short', p[1], p[3])
+            p[0] = make_node('declare_short', p[1], p[3])
         else:
             # ID ASSIGN expression SEMI_OPTIONAL
-            p[0] = ('assign', p[1], p[3])
+            p[0] = make_node('assign', p[1], p[3])
 
     # 4) Reglas de 7 símbolos:
     #   VAR ID type_spec ASSIGN expression SEMI_OPTIONAL
     elif len(p) == 7:
-        p[0] = ('var', p[2], p[3], p[5])
+        p[0] = make_node('var', p[2], p[3], p[5])
 
 def p_type_spec(p):
     """type_spec : INT_TYPE
@@ -131,7 +150,7 @@ def p_type_spec(p):
 
 def p_control_structure_if(p):
     """control_structure : IF expression LBRACE statement_list RBRACE else_part"""
-    p[0] = ('if', p[2], p[4], p[6])
+    p[0] = make_node('if', p[2], p[4], p[6])
 
 def p_else_part(p):
     """else_part : ELSE LBRACE statement_list RBRACE
@@ -174,9 +193,9 @@ def p_expression(p):
                | factor
     """
     if len(p) == 4:
-        p[0] = ('binop', p[2], p[1], p[3])
+        p[0] = make_node('binop', p[2], p[1], p[3])
     elif len(p) == 3:
-        p[0] = ('unary', p[1], p[2])
+        p[0] = make_node('unary', p[1], p[2])
     else:
         p[0] = p[1]
 
@@ -195,7 +214,7 @@ def p_assign_statement(p):
     """
     # AST de ejemplo: ("assign", operador, identificador, expresión)
     # Para z <<= 1 -> ("assign", "LSHIFT_ASSIGN", "z", 1)
-    p[0] = ("assign", p[2], p[1], p[3])
+    p[0] = make_node("assign", p[2], p[1], p[3])
 
 def p_semi_optional(p):
     """
@@ -219,7 +238,7 @@ def p_factor(p):
     if len(p) == 4:
         p[0] = p[2]  # (expression)
     elif len(p) == 7:
-        p[0] = ('call', p[1], p[3], p[5])  # ID.ID(args)
+        p[0] = make_node('call', p[1], p[3], p[5])  # ID.ID(args)
     else:
         p[0] = p[1]
 
@@ -243,34 +262,126 @@ parser = yacc.yacc()
 
 
 #       FUNCIÓN FINAL parse_code()
-def parse_code(code, do_semantic=True, sem_logger=None, git_user=None):
+def parse_code(code, do_semantic=True, sem_logger=None, git_user=None, optimize=False,
+               engine='yacc', xref=None, hashcons=None, profile=None,
+               stream=False, retain_funcs=False, on_diagnostic=None, on_declaration=None):
     """
     Retorna:
       (success, ast, sem_errors)
+
+    engine='rd' usa el parser descendente recursivo de rdparser.py en lugar
+    de las tablas LALR de PLY (mismo AST y mismos mensajes de error).
+
+    Con optimize=True el AST retornado tiene las constantes plegadas y los
+    if con condición constante podados; las estadísticas quedan en
+    last_optimization_stats. El análisis semántico se hace sobre el AST
+    sin optimizar, así que también revisa las ramas podadas.
+
+    Con xref (un xref.XrefIndex) se registran las declaraciones y usos de
+    los identificadores a medida que el parser consume los tokens.
+
+    Con hashcons (un hashcons.HashConsFactory) los subárboles idénticos se
+    construyen una sola vez y se comparten. Sirve cualquier objeto con un
+    método node(*campos), p. ej. astdiff.MerkleHasher.
+
+    Con profile (un grammar_profile.GrammarProfile) se cuentan reducciones
+    por producción, tokens por tipo, estados y profundidad de la pila, y se
+    mide el tiempo de cada acción p_*. Sólo con engine='yacc'.
+
+    Con stream=True (sólo engine='yacc') el análisis semántico corre
+    durante el parseo: cada declaración de nivel superior se analiza
+    apenas se reduce, sus diagnósticos se pasan a on_diagnostic(mensaje)
+    y el subárbol de cada func se descarta salvo con retain_funcs=True.
+    El AST retornado sólo tiene lo conservado y la memoria queda acotada
+    por la función más grande.
+
+    on_declaration(nodo) se llama con cada declaración de nivel superior
+    apenas se parsea, tal como sale del parser (sin plegar), p. ej. para
+    escribir el AST mientras se produce (output_writer.AstStreamWriter).
+    Con errores sintácticos puede recibir declaraciones que la
+    recuperación de errores luego descarta.
     """
-    global syntax_error_flag
+    global syntax_error_flag, last_optimization_stats, make_node, top_declaration_hook
     syntax_error_flag = False
 
-    ast = parser.parse(code, lexer=lexer)
-
-    syntax_ok = not syntax_error_flag
+    lx = xref.wrap(lexer) if xref is not None else lexer
+    node = hashcons.node if hashcons is not None else plain_node
+    if profile is not None and engine != 'yacc':
+        raise ValueError("El perfil de la gramática requiere engine='yacc'")
+    stream = stream and do_semantic
+    if stream and engine != 'yacc':
+        raise ValueError("El análisis en streaming requiere engine='yacc'")
+
+    if stream:
+        if git_user:
+            import semant as sem_module
+            sem_module.GIT_USER = git_user
+        sem = sem_logger or SemanticAnalyzer()
+        sem.begin()
+        stats = new_stats() if optimize else None
+        memo = {} if optimize and hashcons is not None else None
+
+        def analyze_top(top):
+            if on_declaration is not None:
+                on_declaration(top)
+            for msg in sem.feed(top):
+                if on_diagnostic is not None:
+                    on_diagnostic(msg)
+            if optimize and top[0] == 'func':
+                top = fold_constants(('program', [top]), stats, memo)[0][1][0]
+            if top[0] == 'func' and not retain_funcs:
+                return None
+            return top
+
+    if engine == 'rd':
+        ast, syntax_ok = rdparser.parse(code, lx, make_node=node, on_declaration=on_declaration)
+        syntax_error_flag = not syntax_ok
+    else:
+        make_node = node
+        if stream:
+            top_declaration_hook = analyze_top
+        elif on_declaration is not None:
+            def notify_top(top):
+                on_declaration(top)
+                return top
+            top_declaration_hook = notify_top
+        try:
+            if profile is not None:
+                with profile.instrument(parser, lx) as plx:
+                    ast = parser.parse(code, lexer=plx)
+            else:
+                ast = parser.parse(code, lexer=lx)
+        finally:
+            make_node = plain_node
+            top_declaration_hook = None
+        syntax_ok = not syntax_error_flag
+
+    if stream:
+        # Las funciones ya se plegaron y analizaron a medida que llegaban
+        if optimize:
+            last_optimization_stats = stats
+        if ast is None:
+            # Sin AST no hay log, pero lo ya emitido se devuelve igual
+            return (syntax_ok, ast, sem.errors)
+        return (syntax_ok, ast, sem.finish())
 
     sem_errors = []
     #if syntax_error_flag:
      #   return (False, None, [])
 
-    # Si no se quiere análisis semántico
-    if not do_semantic or ast is None:
-        return (syntax_ok, ast, sem_errors)
-
-    # Configurar usuario de GitHub antes de crear el analizador
-    if git_user:
-        import semant as sem_module
-        sem_module.GIT_USER = git_user
+    # Ejecutar semántico (sobre el AST sin optimizar)
+    if do_semantic and ast is not None:
+        # Configurar usuario de GitHub antes de crear el analizador
+        if git_user:
+            import semant as sem_module
+            sem_module.GIT_USER = git_user
 
-    # Ejecutar semántico
-    sem = sem_logger or SemanticAnalyzer()
-    sem_errors = sem.analyze(ast)
+        sem = sem_logger or SemanticAnalyzer()
+        sem_errors = sem.analyze(ast)
 
+    if optimize and ast is not None:
+        # Con hash-consing cada subárbol distinto se pliega una sola vez
+        memo = {} if hashcons is not None else None
+        ast, last_optimization_stats = fold_constants(ast, memo=memo)
 
     return (syntax_ok, ast, sem_errors)
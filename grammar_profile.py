@@ -0,0 +1,237 @@
+# grammar_profile.py - Perfil de la gramática LALR de goYacc
+#
+# Instrumentación opcional de parser.parse(): mientras dura un parseo se
+# reemplaza el callable de cada producción de PLY por uno que cuenta la
+# reducción y mide el tiempo de la acción p_*, y el lexer se envuelve para
+# ver cada token que pide el parser. En ambos puntos se anota el estado
+# LALR en el tope de la pila y la profundidad de la pila, en histogramas
+# separados: los estados que leen un token no son los que reducen.
+#
+# Desplazamientos: un token leído cuenta recién cuando aparece en la pila
+# de símbolos, sea en el RHS de una reducción o cerca del tope cuando el
+# parser pide el token siguiente. Los que descarta la recuperación de
+# errores nunca llegan a la pila, y el $end no se desplaza.
+#
+# No se usa el modo debug de PLY: arma el texto de la pila y el repr del
+# resultado en cada paso, y con las listas recursivas por derecha
+# (top_declaration_list, statement_list) eso crece con el tamaño del
+# archivo.
+#
+# Un mismo GrammarProfile acumula varios parseos, para perfilar un corpus:
+#   prof = GrammarProfile()
+#   for code in archivos:
+#       parse_code(code, do_semantic=False, profile=prof)
+#   prof.save_json('logs/perfil_gramatica.json')
+import argparse
+import json
+import os
+from collections import Counter
+from contextlib import contextmanager
+from time import perf_counter
+
+
+class GrammarProfile:
+    def __init__(self):
+        self.parses = 0
+        self.productions = []     # texto de cada producción ('expression -> expression PLUS expression')
+        self.actions = []         # función p_* de cada producción
+        self.reductions = []      # reducciones por número de producción
+        self.action_time = []     # segundos en la acción por número de producción
+        self.tokens_read = 0            # tokens pedidos al lexer (sin el $end)
+        self.shifts = Counter()         # tipo de token -> tokens desplazados
+        self.read_states = Counter()    # estado LALR -> tokens leídos en él
+        self.read_depths = Counter()    # profundidad de la pila -> tokens leídos
+        self.reduce_states = Counter()  # estado LALR -> reducciones decididas en él
+        self.reduce_depths = Counter()  # profundidad de la pila -> reducciones
+        # Último token leído que todavía no se vio en la pila, y reducciones
+        # desde entonces (los símbolos que pueden haber quedado encima)
+        self._lookahead = None
+        self._since_read = 0
+
+    def _bind_grammar(self, parser):
+        if self.productions:
+            return
+        for prod in parser.productions:
+            self.productions.append(prod.str)
+            self.actions.append(prod.func or '')
+        self.reductions = [0] * len(self.productions)
+        self.action_time = [0.0] * len(self.productions)
+
+    def _shifted(self, tok):
+        self.shifts[tok.type] += 1
+        self._lookahead = None
+
+    def _resolve(self, symstack):
+        """Decide si el último token leído se desplazó antes de leer otro"""
+        tok = self._lookahead
+        if tok is not None:
+            self._lookahead = None
+            if tok in symstack[-(self._since_read + 1):]:
+                self.shifts[tok.type] += 1
+
+    def _timed(self, parser, number, action):
+        reductions = self.reductions
+        action_time = self.action_time
+        states = self.reduce_states
+        depths = self.reduce_depths
+
+        def timed(p):
+            stack = parser.statestack
+            states[stack[-1]] += 1
+            depths[len(stack)] += 1
+            self._since_read += 1
+            if self._lookahead is not None and self._lookahead in p.slice:
+                self._shifted(self._lookahead)
+            start = perf_counter()
+            action(p)
+            action_time[number] += perf_counter() - start
+            reductions[number] += 1
+        return timed
+
+    @contextmanager
+    def instrument(self, parser, lexer):
+        """
+        Instrumenta el parser mientras dura el bloque y entrega el lexer
+        envuelto que hay que pasarle a parser.parse().
+        """
+        self._bind_grammar(parser)
+        originals = [prod.callable for prod in parser.productions]
+        for number, prod in enumerate(parser.productions):
+            if prod.callable is not None:
+                prod.callable = self._timed(parser, number, prod.callable)
+        self.parses += 1
+        try:
+            yield ProfilingLexer(lexer, parser, self)
+        finally:
+            self._resolve(getattr(parser, 'symstack', ()))
+            for prod, original in zip(parser.productions, originals):
+                prod.callable = original
+
+    # Resultados
+    def action_totals(self):
+        """{función p_*: (reducciones, segundos)} sumando sus producciones"""
+        totals = {}
+        for number, name in enumerate(self.actions):
+            calls, secs = totals.get(name, (0, 0.0))
+            totals[name] = (calls + self.reductions[number], secs + self.action_time[number])
+        return totals
+
+    @staticmethod
+    def _depth_summary(depths):
+        total = sum(depths.values())
+        return {
+            'maxima': max(depths, default=0),
+            'media': round(sum(d * n for d, n in depths.items()) / total, 2) if total else 0.0,
+            'histograma': {str(d): depths[d] for d in sorted(depths)},
+        }
+
+    def as_dict(self):
+        productions = [
+            {
+                'produccion': self.productions[n],
+                'accion': self.actions[n],
+                'reducciones': self.reductions[n],
+                'tiempo_s': round(self.action_time[n], 6),
+            }
+            for n in sorted(range(len(self.productions)), key=lambda n: -self.reductions[n])
+            if self.reductions[n]
+        ]
+        actions = {
+            name: {'reducciones': calls, 'tiempo_s': round(secs, 6),
+                   'us_por_reduccion': round(secs / calls * 1e6, 3) if calls else 0.0}
+            for name, (calls, secs) in sorted(self.action_totals().items(),
+                                              key=lambda kv: -kv[1][1])
+            if calls
+        }
+        return {
+            'parseos': self.parses,
+            'tokens_leidos': self.tokens_read,
+            'tokens_desplazados': sum(self.shifts.values()),
+            'reducciones_totales': sum(self.reductions),
+            'producciones': productions,
+            'acciones': actions,
+            'desplazamientos_por_token': dict(self.shifts.most_common()),
+            'estados_lectura': {str(s): n for s, n in self.read_states.most_common()},
+            'estados_reduccion': {str(s): n for s, n in self.reduce_states.most_common()},
+            'profundidad_pila_lectura': self._depth_summary(self.read_depths),
+            'profundidad_pila_reduccion': self._depth_summary(self.reduce_depths),
+        }
+
+    def save_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.as_dict(), f, ensure_ascii=False, indent=1)
+        return path
+
+    def report(self, top=10):
+        data = self.as_dict()
+        lines = [f"Parseos: {data['parseos']}, tokens leídos: {data['tokens_leidos']}, "
+                 f"desplazados: {data['tokens_desplazados']}, "
+                 f"reducciones: {data['reducciones_totales']}",
+                 "", "Producciones más reducidas:"]
+        for p in data['producciones'][:top]:
+            lines.append(f"  {p['reducciones']:>9}  {p['tiempo_s']:8.3f}s  {p['produccion']}")
+        lines += ["", "Tiempo por acción:"]
+        for name, a in list(data['acciones'].items())[:top]:
+            lines.append(f"  {name:<26} {a['tiempo_s']:8.3f}s  {a['us_por_reduccion']:8.2f} us/red")
+        for title, key in (("Estados que más leen tokens:", 'estados_lectura'),
+                           ("Estados que más reducen:", 'estados_reduccion')):
+            lines += ["", title]
+            for state, n in list(data[key].items())[:top]:
+                lines.append(f"  estado {state:>4}: {n}")
+        lines.append("")
+        for label, key in (("lectura", 'profundidad_pila_lectura'),
+                           ("reducción", 'profundidad_pila_reduccion')):
+            depth = data[key]
+            lines.append(f"Profundidad de pila ({label}): máxima {depth['maxima']}, "
+                         f"media {depth['media']}")
+        return '\n'.join(lines)
+
+
+class ProfilingLexer:
+    """Envuelve un lexer y anota cada token que el parser le pide"""
+    def __init__(self, lexer, parser, profile):
+        self.lexer = lexer
+        self.parser = parser
+        self.profile = profile
+
+    def input(self, code):
+        self.lexer.input(code)
+
+    def token(self):
+        profile = self.profile
+        parser = self.parser
+        profile._resolve(parser.symstack)
+        tok = self.lexer.token()
+        stack = parser.statestack
+        profile.read_states[stack[-1]] += 1
+        profile.read_depths[len(stack)] += 1
+        if tok is not None:
+            profile.tokens_read += 1
+            profile._lookahead = tok
+            profile._since_read = 0
+        return tok
+
+    def __iter__(self):
+        return iter(self.token, None)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Perfil de producciones y estados del parser LALR")
+    ap.add_argument('archivos', nargs='+', help='Archivos .go del corpus')
+    ap.add_argument('-o', '--output', default=os.path.join('logs', 'perfil_gramatica.json'),
+                    help='Archivo JSON de salida')
+    ap.add_argument('--top', type=int, default=10, help='Filas por sección en el resumen')
+    args = ap.parse_args()
+
+    from goYacc import parse_code
+
+    profile = GrammarProfile()
+    for path in args.archivos:
+        with open(path, 'r', encoding='utf-8') as f:
+            parse_code(f.read(), do_semantic=False, profile=profile)
+    print(profile.report(args.top))
+    print(f"\nPerfil guardado en {profile.save_json(args.output)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+# hashcons.py - Fábrica de nodos con hash-consing para el AST
+#
+# El código generado repite muchísimo las mismas expresiones y literales.
+# Con una HashConsFactory las acciones del parser (goYacc y rdparser)
+# construyen los nodos con factory.node(...): si ya existe un nodo con la
+# misma estructura se devuelve ese mismo objeto, así que los subárboles
+# idénticos se comparten, la igualdad estructural es `is` y los resultados
+# por subárbol (p. ej. el plegado de constantes) se calculan una sola vez.
+#
+# La clave de un nodo usa el id() de sus hijos (que ya están internados)
+# y el tipo de cada literal, para no confundir 1, 1.0 y True. Las listas
+# (sentencias, argumentos) no se internan: forman parte de la clave del
+# nodo que las contiene. El AST compartido no debe modificarse en sitio.
+
+
+def plain_node(*fields):
+    """Constructor por defecto: una tupla nueva en cada llamada"""
+    return fields
+
+
+class HashConsFactory:
+    def __init__(self):
+        self._table = {}
+        self.created = 0
+        self.reused = 0
+
+    def _key(self, value):
+        if type(value) is tuple:
+            return id(value)
+        if type(value) is list:
+            return ('list',) + tuple(self._key(v) for v in value)
+        return (type(value), value)
+
+    def node(self, *fields):
+        key = tuple(self._key(f) for f in fields)
+        found = self._table.get(key)
+        if found is not None:
+            self.reused += 1
+            return found
+        self._table[key] = fields
+        self.created += 1
+        return fields
+
+    def clear(self):
+        """Libera la tabla; los nodos ya construidos siguen compartidos"""
+        self._table.clear()
+
+    def __len__(self):
+        return len(self._table)
+
+    def stats(self):
+        total = self.created + self.reused
+        return {
+            'nodos_unicos': self.created,
+            'nodos_reutilizados': self.reused,
+            'tasa_reutilizacion': round(self.reused / total, 3) if total else 0.0,
+        }
+
+
+def count_distinct_nodes(ast):
+    """Cantidad de nodos (tuplas) distintos por identidad en un AST"""
+    seen = set()
+    stack = [ast]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, tuple):
+            if id(node) in seen:
+                continue
+            seen.add(id(node))
+            stack.extend(node)
+        elif isinstance(node, list):
+            stack.extend(node)
+    return len(seen)
+
+
+def benchmark(funcs=2000):
+    """Memoria del AST con y sin hash-consing sobre código repetitivo"""
+    import time
+    import tracemalloc
+
+    import goYacc
+    from rdparser import make_benchmark_source
+
+    code = make_benchmark_source(funcs)
+    for label, factory in (('tuplas', None), ('hash-consing', HashConsFactory())):
+        tracemalloc.start()
+        start = time.perf_counter()
+        _, ast, _ = goYacc.parse_code(code, do_semantic=False, hashcons=factory)
+        elapsed = time.perf_counter() - start
+        if factory is not None:
+            factory.clear()
+        retained = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print(f"{label:<14} {elapsed:7.3f}s  AST retenido {retained / 1024 / 1024:7.2f} MB  "
+              f"nodos distintos {count_distinct_nodes(ast)}")
+        ast = None
+
+
+if __name__ == '__main__':
+    benchmark()
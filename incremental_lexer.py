@@ -0,0 +1,278 @@
+# incremental_lexer.py - Re-lexing incremental de regiones editadas
+#
+# Pensado para un editor: en lugar de volver a pasar golex.lexer.input()
+# sobre todo el buffer en cada tecla, IncrementalLexer guarda el flujo de
+# tokens anterior y, ante una edición, re-lexea sólo desde el punto de
+# reinicio más cercano hasta que el flujo nuevo vuelve a coincidir con el
+# viejo.
+#
+# Puntos de reinicio: el final de cada token. golex no tiene estados, así
+# que después de devolver un token el lexer nunca está dentro de un string,
+# raw string o comentario de bloque; retomar desde ahí con input() + lexpos
+# da los mismos tokens que un lexeo completo. Se dejan LOOKAHEAD caracteres
+# de margen antes de la edición porque algunas reglas miran más allá del
+# token que terminan devolviendo (p. ej. '1.5e+' seguido de un dígito).
+#
+# Resincronización: cuando un token nuevo empieza después del texto
+# insertado y coincide (tipo, valor y extensión) con un token viejo
+# desplazado por el delta de la edición, el resto del flujo es idéntico
+# salvo por las posiciones y los números de línea.
+#
+# Ese desplazamiento no se aplica token por token: queda como una entrada
+# pendiente (primer índice, delta de posición, delta de línea) que se suma
+# al leer. Cada tanto las entradas se consolidan en los arreglos.
+#
+# Caso especial: un '/*', '`' o '"' que no cerró se lexeó como tokens
+# sueltos (o carácter ilegal). Si la edición agrega el cierre, el lexeo
+# cambia desde esa apertura, así que el reinicio no puede quedar después.
+import sys
+import time
+from array import array
+from collections import namedtuple
+
+import golex
+
+Tok = namedtuple('Tok', 'type value lineno lexpos end')
+# index: primer token reemplazado; removed / inserted: tokens viejos y
+# nuevos; los tokens que siguen se corren pos_shift caracteres y
+# line_shift líneas.
+TokenDelta = namedtuple('TokenDelta', 'index removed inserted pos_shift line_shift')
+
+ILLEGAL = 'ILLEGAL'
+LOOKAHEAD = 3
+_COMPACT_AFTER = 64
+
+
+class IncrementalLexer:
+    def __init__(self, code='', lineno=1):
+        self.code = code
+        self.first_line = lineno
+        self._lexer = golex.lexer.clone()
+        # Los caracteres ilegales quedan en el flujo como tokens ILLEGAL en
+        # lugar de imprimirse y acumularse en golex.ERRORS en cada tecla
+        self._lexer.lexerrorf = _illegal_char
+        self._types = []
+        self._values = []
+        self._starts = array('q')
+        self._ends = array('q')
+        self._lines = array('q')
+        self._shifts = []   # [primer índice, delta de posición, delta de línea]
+        for t in self._lex(code, 0, lineno):
+            self._append(t)
+
+    # Lexeo
+    def _lex(self, code, pos, lineno):
+        lexer = self._lexer
+        lexer.input(code)
+        lexer.lexpos = pos
+        lexer.lineno = lineno
+        while True:
+            tok = lexer.token()
+            if tok is None:
+                return
+            yield Tok(tok.type, tok.value, tok.lineno, tok.lexpos, lexer.lexpos)
+
+    def _append(self, t):
+        self._types.append(t.type)
+        self._values.append(t.value)
+        self._starts.append(t.lexpos)
+        self._ends.append(t.end)
+        self._lines.append(t.lineno)
+
+    # Desplazamientos pendientes
+    def _shift_at(self, i):
+        dpos = dline = 0
+        for first, p, l in self._shifts:
+            if i >= first:
+                dpos += p
+                dline += l
+        return dpos, dline
+
+    def _start(self, i):
+        return self._starts[i] + self._shift_at(i)[0]
+
+    def _end(self, i):
+        return self._ends[i] + self._shift_at(i)[0]
+
+    def _compact(self):
+        shifts = sorted(self._shifts)
+        self._shifts = []
+        n = len(self._types)
+        dpos = dline = 0
+        for k, (first, p, l) in enumerate(shifts):
+            dpos += p
+            dline += l
+            stop = shifts[k + 1][0] if k + 1 < len(shifts) else n
+            for i in range(first, stop):
+                self._starts[i] += dpos
+                self._ends[i] += dpos
+                self._lines[i] += dline
+
+    def _count_until(self, get, limit):
+        """Cantidad de tokens con get(i) <= limit (get es monótona)"""
+        lo, hi = 0, len(self._types)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if get(mid) <= limit:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    # Acceso
+    def __len__(self):
+        return len(self._types)
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self._types)
+        dpos, dline = self._shift_at(i)
+        return Tok(self._types[i], self._values[i], self._lines[i] + dline,
+                   self._starts[i] + dpos, self._ends[i] + dpos)
+
+    def __iter__(self):
+        for i in range(len(self._types)):
+            yield self[i]
+
+    def tokens(self):
+        """Tokens tal como los devuelve golex (sin los ILLEGAL)"""
+        return [t for t in self if t.type != ILLEGAL]
+
+    def errors(self):
+        return [t for t in self if t.type == ILLEGAL]
+
+    def token_at(self, offset):
+        """Token que contiene el offset, o None"""
+        i = self._count_until(self._start, offset) - 1
+        if i >= 0 and offset < self._end(i):
+            return self[i]
+        return None
+
+    # Edición
+    def _restart_limit(self, start):
+        """Offset hasta el que los tokens viejos siguen valiendo"""
+        code = self.code
+        limit = start - LOOKAHEAD
+        # '/*' sin cerrar: sólo puede estar después del último '*/' (o
+        # compartiendo el '*' con él, como en '/*/')
+        opener = code.find('/*', max(code.rfind('*/') - 1, 0), start)
+        if opener >= 0:
+            limit = min(limit, opener)
+        # '`' sin cerrar: sólo puede ser el último del archivo
+        tick = code.rfind('`', 0, start)
+        if tick >= 0 and code.find('`', tick + 1) < 0:
+            limit = min(limit, tick)
+        # '"' sin cerrar: el string no cruza líneas, basta con la línea actual
+        line_start = code.rfind('\n', 0, start) + 1
+        if code.find('"', line_start, start) >= 0:
+            limit = min(limit, line_start)
+        return limit
+
+    def edit(self, start, end, text):
+        """
+        Reemplaza code[start:end] por text y re-lexea lo necesario.
+        Retorna un TokenDelta con los tokens reemplazados.
+        """
+        old = self.code
+        if not 0 <= start <= end <= len(old):
+            raise ValueError(f"Rango de edición inválido: {start}..{end}")
+        k = self._count_until(self._end, self._restart_limit(start))
+        restart, lineno = (self._end(k - 1), self[k - 1].lineno) if k else (0, self.first_line)
+
+        code = old[:start] + text + old[end:]
+        delta = len(text) - (end - start)
+        edit_end = start + len(text)
+        n = len(self._types)
+        j = max(k, self._count_until(self._start, end - 1))
+        inserted = []
+        line_shift = 0
+        for t in self._lex(code, restart, lineno):
+            if t.lexpos >= edit_end:
+                while j < n and self._start(j) + delta < t.lexpos:
+                    j += 1
+                if j < n and self._start(j) + delta == t.lexpos:
+                    old_tok = self[j]
+                    if (old_tok.type == t.type and old_tok.end + delta == t.end
+                            and old_tok.value == t.value):
+                        line_shift = t.lineno - old_tok.lineno
+                        break
+            inserted.append(t)
+        else:
+            j = n
+
+        removed = [self[i] for i in range(k, j)]
+        self.code = code
+        self._splice(k, j, inserted, delta, line_shift)
+        return TokenDelta(k, removed, inserted, delta, line_shift)
+
+    def _splice(self, k, j, inserted, delta, line_shift):
+        m = len(inserted)
+        # Los tokens nuevos se guardan sin los desplazamientos que ya les aplican
+        dpos, dline = self._shift_at(k)
+        self._types[k:j] = [t.type for t in inserted]
+        self._values[k:j] = [t.value for t in inserted]
+        self._starts[k:j] = array('q', [t.lexpos - dpos for t in inserted])
+        self._ends[k:j] = array('q', [t.end - dpos for t in inserted])
+        self._lines[k:j] = array('q', [t.lineno - dline for t in inserted])
+
+        moved = k + m - j
+        shifts = []
+        for first, p, l in self._shifts:
+            if first > k:
+                first = max(first, j) + moved
+            shifts.append([first, p, l])
+        if (delta or line_shift) and k + m < len(self._types):
+            shifts.append([k + m, delta, line_shift])
+        merged = {}
+        for first, p, l in shifts:
+            acc = merged.setdefault(first, [first, 0, 0])
+            acc[1] += p
+            acc[2] += l
+        self._shifts = [s for s in merged.values() if s[1] or s[2]]
+        if len(self._shifts) > _COMPACT_AFTER:
+            self._compact()
+
+
+def _illegal_char(t):
+    t.type = ILLEGAL
+    t.value = t.value[0]
+    t.lexer.skip(1)
+    return t
+
+
+def lex_all(code, lineno=1):
+    """Lexeo completo, con el mismo formato que IncrementalLexer"""
+    return list(IncrementalLexer(code, lineno))
+
+
+def benchmark(funcs=2000, edits=200):
+    """Compara re-lexear todo contra la edición incremental"""
+    import random
+
+    from rdparser import make_benchmark_source
+
+    code = make_benchmark_source(funcs)
+    rng = random.Random(0)
+    inc = IncrementalLexer(code)
+    positions = [rng.randrange(len(code)) for _ in range(edits)]
+
+    start = time.perf_counter()
+    relexed = 0
+    for pos in positions:
+        delta = inc.edit(pos, pos, 'x')
+        relexed += len(delta.inserted)
+    incremental = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(10):
+        lex_all(inc.code)
+    full = (time.perf_counter() - start) / 10
+
+    print(f"{len(code) / 1024:.0f} KB, {len(inc)} tokens")
+    print(f"lexeo completo:     {full * 1000:8.2f} ms por edición")
+    print(f"lexeo incremental:  {incremental / edits * 1000:8.2f} ms por edición "
+          f"({relexed / edits:.1f} tokens re-lexeados en promedio)")
+
+
+if __name__ == '__main__':
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
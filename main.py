@@ -1,22 +1,43 @@
 # main.py - Orquestador PRINCIPAL
+import argparse
+import shutil
 import sys
+import tempfile
 from golex import lexer
 from goYacc import parse_code
+import goYacc
 import semant
+from optimizer import fold_constants, format_stats
+from output_writer import (OUTPUT_MODES, AstStreamWriter, BufferedOutput, write_tokens, write_ast,
+                           count_ast_nodes)
+from recognizer import recognize
+from memprofile import profile_analysis, format_profile
+from parallel_parse import parse_code_parallel
+from xref import XrefIndex, xref_filename
+from project_db import ProjectDB, analysis_key
+from package_index import PackageIndex, content_hash
 
-def run_lexical_analysis(code):
+def run_lexical_analysis(code, mode='full'):
+    """
+    Modos de salida:
+      full    -> imprime cada token
+      summary -> sólo el total
+      ndjson  -> un token JSON por línea
+    Los tokens se escriben a medida que se generan, sin guardarlos en lista.
+    """
     print("\n" + "="*60)
     print("   ANÁLISIS LÉXICO")
     print("="*60)
-    lexer.input(code)
-    tokens_list = []
-    for tok in lexer:
-        tokens_list.append(tok)
-        print(f"  {tok}")
-    print(f"\nTotal de tokens: {len(tokens_list)}")
-    return tokens_list
-
-def run_syntax_and_semantic(code, github_user):
+    out = BufferedOutput()
+    total = write_tokens(lexer, code, out, mode)
+    out.flush()
+    print(f"\nTotal de tokens: {total}")
+    return total
+
+def run_syntax_and_semantic(code, github_user, mode='full', max_depth=None, max_nodes=None,
+                            optimize=False, engine='yacc', jobs=1, with_xref=False,
+                            dataflow=False, db_path=None, filename=None, stream=False,
+                            index=None):
     print("\n" + "="*60)
     print("   ANÁLISIS SINTÁCTICO Y SEMÁNTICO")
     print("="*60)
@@ -24,16 +45,97 @@ def run_syntax_and_semantic(code, github_user):
     # Configurar usuario de GitHub en el módulo semant
     semant.GIT_USER = github_user
     
-    syntax_ok, ast, sem_errors = parse_code(code, do_semantic=True, git_user=github_user)
+    sem = semant.SemanticAnalyzer(index=index, dataflow=dataflow)
+
+    # El AST se escribe a medida que el parser produce cada declaración, a
+    # un temporal: sólo se muestra si no hubo errores sintácticos, después
+    # del mensaje de éxito. Con --stream en modo full no: sólo se escribe
+    # después lo que se haya conservado
+    writer = None
+    on_declaration = None
+    if mode != 'summary' and not (stream and mode == 'full'):
+        sink = tempfile.TemporaryFile('w+', encoding='utf-8')
+        writer = AstStreamWriter(BufferedOutput(sink), mode, max_depth, max_nodes)
+
+        def on_declaration(top):
+            if optimize:
+                # Se muestra plegado, igual que el AST que queda al final
+                top = fold_constants(('program', [top]))[0][1][0]
+            writer.declaration(top)
+
+    def close_ast():
+        if writer is not None:
+            writer.end()
+            writer.out.flush()
+
+    if stream:
+        # Diagnósticos a medida que se reduce cada función; el índice
+        # SQLite necesita las funciones, así que con --db se conservan
+        print("\nDiagnósticos (streaming):")
+        xref = XrefIndex() if with_xref else None
+        syntax_ok, ast, sem_errors = parse_code(code, do_semantic=True, sem_logger=sem,
+                                                git_user=github_user, optimize=optimize,
+                                                xref=xref, stream=True,
+                                                retain_funcs=bool(db_path),
+                                                on_diagnostic=lambda msg: print(f"  {msg}"),
+                                                on_declaration=on_declaration)
+        close_ast()
+        if xref is not None and sem.log_file:
+            print(f"[XREF] Índice guardado en: {xref.save_json(xref_filename(sem.log_file))}")
+    else:
+        xref = None
+        if jobs > 1 and not with_xref:
+            syntax_ok, ast, _ = parse_code_parallel(code, do_semantic=False, engine=engine,
+                                                    workers=jobs)
+            # Los trozos se parsean en otros procesos: el AST se escribe al final
+            if ast is not None and on_declaration is not None:
+                for top in ast[1]:
+                    on_declaration(top)
+        else:
+            xref = XrefIndex() if with_xref else None
+            syntax_ok, ast, _ = parse_code(code, do_semantic=False, engine=engine, xref=xref,
+                                           on_declaration=on_declaration)
+        close_ast()
+        # El semántico revisa el AST sin optimizar; después se pliega
+        sem_errors = sem.analyze(ast) if ast is not None else []
+        if optimize and ast is not None:
+            ast, goYacc.last_optimization_stats = fold_constants(ast)
+        if xref is not None and sem.log_file:
+            print(f"[XREF] Índice guardado en: {xref.save_json(xref_filename(sem.log_file))}")
+
+    if db_path:
+        with ProjectDB(db_path) as db:
+            db.record_many([(filename, content_hash(code), ast, sem if ast is not None else None,
+                             syntax_ok)], analysis_key(dataflow))
+        print(f"[DB] Resultados guardados en: {db_path}")
+
+    if optimize and goYacc.last_optimization_stats:
+        print(f"\nOptimización: {format_stats(goYacc.last_optimization_stats)}")
 
     if not syntax_ok:
         print("\nSe detectaron errores sintácticos.")
         print("   El análisis semántico no se pudo completar.")
     else:
         print("\n✔ Análisis sintáctico completado exitosamente")
-        print("\nÁRBOL DE SINTAXIS ABSTRACTA (AST):")
-        print("-"*60)
-        print(ast)
+        if writer is not None:
+            print("\nÁRBOL DE SINTAXIS ABSTRACTA (AST):")
+            print("-"*60)
+            sys.stdout.flush()
+            sink.seek(0)
+            shutil.copyfileobj(sink, sys.stdout)
+            sys.stdout.flush()
+        elif stream and not db_path:
+            print("\n(AST de las funciones no retenido en modo --stream)")
+        elif mode == 'summary':
+            print(f"\nNodos del AST: {count_ast_nodes(ast)}")
+        else:
+            print("\nÁRBOL DE SINTAXIS ABSTRACTA (AST):")
+            print("-"*60)
+            out = BufferedOutput()
+            write_ast(ast, out, max_depth=max_depth, max_nodes=max_nodes)
+            out.flush()
+    if writer is not None:
+        sink.close()
 
     print("\n" + "="*60)
     print("   ERRORES SEMÁNTICOS DETECTADOS")
@@ -45,6 +147,31 @@ def run_syntax_and_semantic(code, github_user):
     else:
         print("✔ No se encontraron errores semánticos.")
 
+    if dataflow:
+        print("\n" + "="*60)
+        print("   ADVERTENCIAS DE FLUJO DE DATOS")
+        print("="*60)
+        if sem.warnings:
+            for i, warning in enumerate(sem.warnings, 1):
+                print(f"{i}. {warning}")
+            print(f"\nTotal de advertencias: {len(sem.warnings)}")
+        else:
+            print("✔ No se encontraron advertencias.")
+
+    return syntax_ok
+
+def run_syntax_check(code):
+    """Sólo validación sintáctica: no construye el AST ni ejecuta el semántico"""
+    print("\n" + "="*60)
+    print("   VALIDACIÓN SINTÁCTICA")
+    print("="*60)
+    syntax_ok, errors = recognize(code)
+    for e in errors:
+        print(f"*** ERROR SINTÁCTICO *** {e['message']}")
+    if syntax_ok:
+        print("\n✔ Sintaxis válida")
+    else:
+        print(f"\nErrores sintácticos: {len(errors)}")
     return syntax_ok
 
 def main():
@@ -59,12 +186,50 @@ def main():
     print(f"Usuario: {github_user}")
 
     # Revisión de argumentos
-    if len(sys.argv) < 2:
+    ap = argparse.ArgumentParser(description="Analizador de Go Lite")
+    ap.add_argument('archivo', nargs='?', help='Archivo .go a analizar')
+    ap.add_argument('--output', choices=OUTPUT_MODES, default='full',
+                    help='Formato de salida de tokens y AST')
+    ap.add_argument('--max-depth', type=int, default=None,
+                    help='Profundidad máxima del AST impreso')
+    ap.add_argument('--max-nodes', type=int, default=None,
+                    help='Cantidad máxima de nodos del AST impreso')
+    ap.add_argument('--optimize', action='store_true',
+                    help='Plegar constantes y podar los if constantes del AST '
+                         '(el análisis semántico revisa el código sin optimizar)')
+    ap.add_argument('--parser', choices=('yacc', 'rd'), default='yacc',
+                    help='Parser a usar: tablas LALR de PLY o descendente recursivo')
+    ap.add_argument('--syntax-only', action='store_true',
+                    help='Sólo validar la sintaxis (sin AST ni análisis semántico)')
+    ap.add_argument('--memprofile', action='store_true',
+                    help='Reportar memoria por fase y por tipo de nodo del AST')
+    ap.add_argument('--mem-limit', type=float, default=None,
+                    help='Techo de memoria en MB (aborta el análisis con reporte)')
+    ap.add_argument('--jobs', type=int, default=1,
+                    help='Procesos para parsear en paralelo las funciones de un archivo grande')
+    ap.add_argument('--xref', action='store_true',
+                    help='Exportar el índice de referencias cruzadas junto al log semántico')
+    ap.add_argument('--dataflow', action='store_true',
+                    help='Advertir variables no usadas, usos sin asignar y asignaciones muertas')
+    ap.add_argument('--db', default=None, metavar='RUTA',
+                    help='Guardar símbolos y diagnósticos en una base SQLite (p. ej. logs/proyecto.db)')
+    ap.add_argument('--stream', action='store_true',
+                    help='Análisis semántico durante el parseo, función por función (sólo --parser yacc)')
+    ap.add_argument('--package-index', default=None, metavar='DIR',
+                    help='Indexar las funciones de los .go de DIR (la carpeta de los otros '
+                         'paquetes) y verificar las llamadas paquete.función()')
+    args = ap.parse_args()
+
+    if not args.archivo:
         print("\n Error: Debes proporcionar un archivo .go")
-        print("Uso: python3 main.py archivo.go")
+        print("Uso: python3 main.py archivo.go [--output full|summary|ndjson]")
         return
 
-    filename = sys.argv[1]
+    if args.stream and args.parser != 'yacc':
+        print("\n Error: --stream sólo está disponible con --parser yacc")
+        return
+
+    filename = args.archivo
     print(f"Archivo: {filename}")
 
     # Leer el archivo
@@ -78,11 +243,33 @@ def main():
         print(f"\nError al leer el archivo: {e}")
         return
 
+    if args.syntax_only:
+        ok = run_syntax_check(code)
+        sys.exit(0 if ok else 1)
+
+    if args.memprofile or args.mem_limit is not None:
+        print("\n" + "="*60)
+        print("   PERFIL DE MEMORIA")
+        print("="*60)
+        semant.GIT_USER = github_user
+        profile = profile_analysis(code, limit_mb=args.mem_limit, engine=args.parser)
+        print(format_profile(profile))
+        sys.exit(1 if profile.aborted else 0)
+
+    index = None
+    if args.package_index is not None:
+        directory = args.package_index
+        index = PackageIndex.build_from_dir(directory)
+        print(f"Índice de paquetes: {len(index.files)} archivo(s), "
+              f"{len(index.functions)} función(es) en {directory}")
+
     # Ejecutar análisis léxico
-    run_lexical_analysis(code)
+    run_lexical_analysis(code, args.output)
     
     # Ejecutar análisis sintáctico y semántico
-    run_syntax_and_semantic(code, github_user)
+    run_syntax_and_semantic(code, github_user, args.output, args.max_depth, args.max_nodes,
+                            args.optimize, args.parser, args.jobs, args.xref, args.dataflow,
+                            args.db, filename, args.stream, index)
     
     print("\n" + "="*60)
     print("   ANÁLISIS COMPLETADO")
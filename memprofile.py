@@ -0,0 +1,183 @@
+# memprofile.py - Perfil de memoria por fase y por tipo de nodo del AST
+#
+# Usa tracemalloc para medir, en cada fase (léxico, sintáctico, semántico),
+# el pico de memoria y lo que queda retenido al terminar. Además desglosa
+# la memoria del AST por tipo de nodo ('binop', 'var', 'call', ...).
+# Con un límite de memoria el análisis se aborta y se reporta lo medido
+# hasta ese momento.
+import sys
+import tracemalloc
+
+from budget import AnalysisBudget, BudgetedLexer, BudgetExceeded
+
+PHASES = ('lexico', 'sintactico', 'semantico')
+MB = 1024 * 1024
+
+
+def ast_memory_by_kind(ast):
+    """
+    Memoria superficial (sys.getsizeof) del AST agrupada por tipo de nodo.
+    Cada objeto se cuenta una sola vez aunque esté compartido; las listas
+    y las hojas se atribuyen al nodo que las contiene.
+    Retorna {tipo: {'count': n, 'bytes': b}}.
+    """
+    by_kind = {}
+    seen = set()
+    getsizeof = sys.getsizeof
+    # (objeto, tipo del nodo dueño, ¿es una posición de nodo?)
+    stack = [(ast, 'program', True)]
+    while stack:
+        obj, owner, node_pos = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+
+        if isinstance(obj, tuple) and obj and isinstance(obj[0], str):
+            kind = obj[0]
+            is_node = node_pos and (kind == 'program' or kind in _NODE_KINDS)
+            if is_node:
+                owner = kind
+            else:
+                owner = f"{owner}:tupla"  # p. ej. parámetros ('a', 'INT_TYPE')
+            entry = by_kind.setdefault(owner, {'count': 0, 'bytes': 0})
+            entry['count'] += 1
+            entry['bytes'] += getsizeof(obj)
+            if is_node and kind == 'func':
+                # Los campos de la func uno por uno: un parámetro llamado
+                # como un tipo de nodo (('call', 'INT_TYPE')) no es un nodo
+                stack.append((obj[1], owner, True))
+                stack.append((obj[2], owner, False))
+                stack.extend((child, owner, True) for child in obj[3:])
+            else:
+                stack.extend((child, owner, is_node) for child in obj[1:])
+            continue
+
+        entry = by_kind.setdefault(owner, {'count': 0, 'bytes': 0})
+        entry['bytes'] += getsizeof(obj)
+        if isinstance(obj, (list, tuple)):
+            stack.extend((child, owner, node_pos) for child in obj)
+    return by_kind
+
+
+_NODE_KINDS = frozenset((
+    'package', 'import', 'func', 'var', 'declare_short', 'assign', 'if', 'block',
+    'binop', 'unary', 'call', 'empty_stmt',
+))
+
+
+class MemoryProfile:
+    def __init__(self):
+        self.phases = {}
+        self.ast_by_kind = {}
+        self.aborted = None
+        self.total_peak = 0
+
+    def as_dict(self):
+        return {
+            'phases': self.phases,
+            'ast_by_kind': self.ast_by_kind,
+            'peak_bytes': self.total_peak,
+            'aborted': self.aborted,
+        }
+
+
+def _measure(profile, name, before):
+    current, peak = tracemalloc.get_traced_memory()
+    profile.phases[name] = {
+        'peak_bytes': max(peak - before, 0),
+        'retained_bytes': current - before,
+    }
+    profile.total_peak = max(profile.total_peak, peak)
+
+
+def profile_analysis(code, limit_mb=None, engine='yacc', do_semantic=True):
+    """
+    Ejecuta léxico, sintáctico y semántico midiendo memoria.
+    limit_mb es un techo duro: al superarlo se aborta y el perfil lleva
+    'aborted' con la fase y el valor.
+    Retorna un MemoryProfile.
+    """
+    import goYacc
+    import semant
+    from golex import lexer
+
+    profile = MemoryProfile()
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    budget = AnalysisBudget(max_memory_mb=limit_mb, check_every=64)
+    budget.start('lexico')
+
+    tokens = ast = sem = None
+    try:
+        # Fase léxica: la lista de LexToken que arma run_lexical_analysis
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        guarded = BudgetedLexer(lexer, budget)
+        guarded.input(code)
+        tokens = list(guarded)
+        _measure(profile, 'lexico', before)
+        profile.phases['lexico']['count'] = len(tokens)
+        tokens = None  # el parser vuelve a pedir los tokens al lexer
+
+        # Fase sintáctica: el AST de tuplas
+        budget.phase = 'sintactico'
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        goYacc.syntax_error_flag = False
+        if engine == 'rd':
+            ast, _ = goYacc.rdparser.parse(code, guarded)
+        else:
+            ast = goYacc.parser.parse(code, lexer=guarded)
+        budget.check()
+        _measure(profile, 'sintactico', before)
+
+        # Fase semántica: errors y symtab del analizador
+        if do_semantic and ast is not None:
+            budget.phase = 'semantico'
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            sem = semant.SemanticAnalyzer(budget=budget)
+            sem.analyze(ast, write_log=False)
+            budget.check()
+            _measure(profile, 'semantico', before)
+            profile.phases['semantico']['count'] = len(sem.errors) + len(sem.symtab)
+
+        if ast is not None:
+            profile.ast_by_kind = ast_memory_by_kind(ast)
+    except BudgetExceeded as e:
+        profile.aborted = e.as_result()
+        _measure(profile, e.phase, before)
+    finally:
+        profile.total_peak = max(profile.total_peak, tracemalloc.get_traced_memory()[1])
+        budget.stop()
+        if not was_tracing:
+            tracemalloc.stop()
+    return profile
+
+
+def format_profile(profile):
+    lines = []
+    lines.append("PERFIL DE MEMORIA POR FASE:")
+    lines.append("-"*60)
+    lines.append(f"  {'fase':<12}{'pico (MB)':>14}{'retenido (MB)':>16}")
+    for name in PHASES:
+        data = profile.phases.get(name)
+        if data is None:
+            continue
+        lines.append(f"  {name:<12}{data['peak_bytes'] / MB:>14.3f}{data['retained_bytes'] / MB:>16.3f}")
+    lines.append(f"\n  Pico total: {profile.total_peak / MB:.3f} MB")
+
+    if profile.ast_by_kind:
+        lines.append("\nMEMORIA DEL AST POR TIPO DE NODO:")
+        lines.append("-"*60)
+        lines.append(f"  {'tipo':<22}{'nodos':>10}{'KB':>14}")
+        total = 0
+        for kind, data in sorted(profile.ast_by_kind.items(), key=lambda kv: -kv[1]['bytes']):
+            total += data['bytes']
+            lines.append(f"  {kind:<22}{data['count']:>10}{data['bytes'] / 1024:>14.1f}")
+        lines.append(f"  {'total':<22}{'':>10}{total / 1024:>14.1f}")
+
+    if profile.aborted:
+        lines.append("\n*** ANÁLISIS ABORTADO *** " + profile.aborted['message'])
+    return "\n".join(lines)
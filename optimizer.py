@@ -0,0 +1,277 @@
+# optimizer.py - Plegado de constantes y eliminación de ramas muertas sobre el AST
+#
+# Se ejecuta entre parse_code() y los consumidores del AST. Recibe el AST
+# en tuplas producido por goYacc y devuelve uno nuevo (el original no se
+# modifica). parse_code() corre el análisis semántico sobre el AST original:
+# el código de una rama podada se sigue revisando.
+#
+# Un if con condición constante se reemplaza por ('block', sentencias) con
+# la rama que queda, así sus declaraciones siguen en su propio ámbito. Si
+# no queda ninguna sentencia, el if desaparece.
+#
+# Limitación: en el AST los identificadores y los literales string son ambos
+# `str`, así que sólo se pliegan enteros, floats y booleanos.
+
+INT_MIN = -(1 << 63)
+INT_MAX = (1 << 63) - 1
+
+# Operadores que requieren dos enteros
+INT_ONLY_OPS = ('%', '|', '^', '&^', '<<', '>>')
+COMPARISON_OPS = ('==', '!=', '<', '<=', '>', '>=')
+
+
+def new_stats():
+    return {
+        'expresiones_plegadas': 0,
+        'ifs_eliminados': 0,
+        'ramas_podadas': 0,
+    }
+
+
+def is_const(value):
+    """True si el valor es un literal numérico o booleano plegable"""
+    return type(value) in (int, float, bool)
+
+
+def _int_div(a, b):
+    # Go trunca hacia cero (Python redondea hacia -inf)
+    q = abs(a) // abs(b)
+    return q if (a >= 0) == (b >= 0) else -q
+
+
+def _int_mod(a, b):
+    # En Go el signo del resto sigue al dividendo
+    return a - b * _int_div(a, b)
+
+
+def fold_binop(op, left, right):
+    """
+    Evalúa `left op right` con semántica de Go.
+    Retorna el valor plegado o None si no se puede (o no se debe) plegar.
+    """
+    lt, rt = type(left), type(right)
+
+    # Booleanos: sólo lógicos e igualdad
+    if lt is bool or rt is bool:
+        if lt is not rt:
+            return None
+        if op == '&&':
+            return left and right
+        if op == '||':
+            return left or right
+        if op == '==':
+            return left == right
+        if op == '!=':
+            return left != right
+        return None
+
+    if op in ('&&', '||'):
+        return None
+
+    if op in COMPARISON_OPS:
+        return {
+            '==': left == right,
+            '!=': left != right,
+            '<': left < right,
+            '<=': left <= right,
+            '>': left > right,
+            '>=': left >= right,
+        }[op]
+
+    if lt is int and rt is int:
+        if op == '+':
+            result = left + right
+        elif op == '-':
+            result = left - right
+        elif op == '*':
+            result = left * right
+        elif op == '/':
+            if right == 0:
+                return None  # división entre cero: se deja para tiempo de ejecución
+            result = _int_div(left, right)
+        elif op == '%':
+            if right == 0:
+                return None
+            result = _int_mod(left, right)
+        elif op == '|':
+            result = left | right
+        elif op == '^':
+            result = left ^ right
+        elif op == '&^':
+            result = left & ~right
+        elif op == '<<':
+            if right < 0 or right > 63:
+                return None
+            result = left << right
+        elif op == '>>':
+            if right < 0:
+                return None
+            result = left >> min(right, 63)
+        else:
+            return None
+        # Desbordamiento de int (64 bits): no se pliega
+        if result < INT_MIN or result > INT_MAX:
+            return None
+        return result
+
+    # Al menos un float (constante sin tipo -> float64)
+    if op in INT_ONLY_OPS:
+        return None
+    left, right = float(left), float(right)
+    if op == '+':
+        return left + right
+    if op == '-':
+        return left - right
+    if op == '*':
+        return left * right
+    if op == '/':
+        if right == 0.0:
+            return None
+        return left / right
+    return None
+
+
+def fold_unary(op, operand):
+    t = type(operand)
+    if op == '-' and t in (int, float):
+        if t is int and -operand > INT_MAX:
+            return None
+        return -operand
+    if op == '!' and t is bool:
+        return not operand
+    return None
+
+
+def fold_expression(expr, stats, memo=None):
+    """
+    Pliega recursivamente una expresión (binop/unary/call).
+    memo ({id(nodo): ...}) guarda el resultado de cada subárbol ya plegado;
+    con un AST hash-consed cada subárbol distinto se pliega una sola vez.
+    """
+    if not isinstance(expr, tuple) or not expr:
+        return expr
+    if memo is None:
+        return _fold_expression(expr, stats, None)
+
+    hit = memo.get(id(expr))
+    if hit is not None:
+        stats['expresiones_plegadas'] += hit[2]
+        return hit[1]
+    before = stats['expresiones_plegadas']
+    result = _fold_expression(expr, stats, memo)
+    # Se guarda el nodo para que su id no se reutilice mientras viva el memo
+    memo[id(expr)] = (expr, result, stats['expresiones_plegadas'] - before)
+    return result
+
+
+def _fold_expression(expr, stats, memo):
+    kind = expr[0]
+    if kind == 'binop':
+        left = fold_expression(expr[2], stats, memo)
+        right = fold_expression(expr[3], stats, memo)
+        if is_const(left) and is_const(right):
+            value = fold_binop(expr[1], left, right)
+            if value is not None:
+                stats['expresiones_plegadas'] += 1
+                return value
+        if left is expr[2] and right is expr[3]:
+            return expr
+        return ('binop', expr[1], left, right)
+
+    if kind == 'unary':
+        operand = fold_expression(expr[2], stats, memo)
+        if is_const(operand):
+            value = fold_unary(expr[1], operand)
+            if value is not None:
+                stats['expresiones_plegadas'] += 1
+                return value
+        if operand is expr[2]:
+            return expr
+        return ('unary', expr[1], operand)
+
+    if kind == 'call':
+        args = [fold_expression(a, stats, memo) for a in expr[3]]
+        if all(new is old for new, old in zip(args, expr[3])):
+            return expr
+        return ('call', expr[1], expr[2], args)
+
+    return expr
+
+
+def fold_statement_list(stmts, stats, memo=None):
+    """Pliega una lista de sentencias, quitando los if eliminados sin rama viva"""
+    result = []
+    for stmt in stmts:
+        folded = fold_statement(stmt, stats, memo)
+        if folded is not None:
+            result.append(folded)
+    return result
+
+
+def fold_statement(stmt, stats, memo=None):
+    if not isinstance(stmt, tuple) or not stmt:
+        return stmt
+
+    kind = stmt[0]
+    if kind == 'var':
+        if stmt[3] is None:
+            return stmt
+        return ('var', stmt[1], stmt[2], fold_expression(stmt[3], stats, memo))
+
+    if kind == 'declare_short':
+        return ('declare_short', stmt[1], fold_expression(stmt[2], stats, memo))
+
+    if kind == 'assign':
+        # ('assign', nombre, expr) o ('assign', op, nombre, expr)
+        return stmt[:-1] + (fold_expression(stmt[-1], stats, memo),)
+
+    if kind == 'if':
+        cond = fold_expression(stmt[1], stats, memo)
+        then_body = fold_statement_list(stmt[2], stats, memo)
+        else_body = fold_statement_list(stmt[3], stats, memo) if stmt[3] is not None else None
+        if type(cond) is bool:
+            stats['ifs_eliminados'] += 1
+            if else_body is not None:
+                stats['ramas_podadas'] += 1
+            elif not cond:
+                stats['ramas_podadas'] += 1
+            body = then_body if cond else else_body
+            return ('block', body) if body else None
+        return ('if', cond, then_body, else_body)
+
+    if kind == 'block':
+        body = fold_statement_list(stmt[1], stats, memo)
+        return ('block', body) if body else None
+
+    if kind in ('binop', 'unary', 'call'):
+        return fold_expression(stmt, stats, memo)
+
+    return stmt
+
+
+def fold_constants(ast, stats=None, memo=None):
+    """
+    Punto de entrada del optimizador.
+    memo: dict opcional para plegar una sola vez los subárboles compartidos
+    Retorna:
+      (ast_optimizado, estadisticas)
+    """
+    if stats is None:
+        stats = new_stats()
+    if ast is None:
+        return (None, stats)
+
+    if ast[0] != 'program':
+        return (fold_statement(ast, stats, memo), stats)
+
+    tops = []
+    for top in ast[1]:
+        if isinstance(top, tuple) and top[0] == 'func':
+            body = fold_statement_list(top[4], stats, memo)
+            top = ('func', top[1], top[2], top[3], body)
+        tops.append(top)
+    return (('program', tops), stats)
+
+
+def format_stats(stats):
+    return ", ".join(f"{k.replace('_', ' ')}: {v}" for k, v in stats.items())
@@ -0,0 +1,237 @@
+# output_writer.py - Salida en streaming y acotada para tokens y AST
+#
+# Evita construir el repr() completo del AST o la lista completa de tokens:
+# todo se escribe por partes a través de un buffer que se vacía cada
+# `bufsize` caracteres.
+import json
+import sys
+
+OUTPUT_MODES = ('full', 'summary', 'ndjson')
+
+
+class BufferedOutput:
+    """Acumula fragmentos de texto y los escribe en bloques"""
+    def __init__(self, stream=None, bufsize=1 << 16):
+        self.stream = stream if stream is not None else sys.stdout
+        self.bufsize = bufsize
+        self.parts = []
+        self.size = 0
+
+    def write(self, text):
+        self.parts.append(text)
+        self.size += len(text)
+        if self.size >= self.bufsize:
+            self.flush()
+
+    def flush(self):
+        if self.parts:
+            self.stream.write(''.join(self.parts))
+            self.parts = []
+            self.size = 0
+        self.stream.flush()
+
+
+def token_record(tok):
+    value = tok.value
+    if not isinstance(value, (str, int, float, bool)):
+        value = str(value)
+    return {'type': tok.type, 'value': value, 'line': tok.lineno, 'pos': tok.lexpos}
+
+
+def write_tokens(lexer, code, out, mode='full'):
+    """
+    Escribe los tokens a medida que el lexer los produce.
+      full   -> una línea "  LexToken(...)" por token
+      ndjson -> un objeto JSON por línea
+      summary-> nada, sólo se cuentan
+    Retorna el total de tokens.
+    """
+    lexer.input(code)
+    count = 0
+    dumps = json.dumps
+    for tok in lexer:
+        count += 1
+        if mode == 'full':
+            out.write(f"  {tok}\n")
+        elif mode == 'ndjson':
+            out.write(dumps(token_record(tok), ensure_ascii=False))
+            out.write('\n')
+    return count
+
+
+def write_ast(ast, out, max_depth=None, max_nodes=None):
+    """
+    Serializa el AST de forma iterativa con el mismo formato que repr().
+    Los subárboles más profundos que max_depth se escriben como '...';
+    al superar max_nodes se corta la salida con '...'.
+    Retorna el número de nodos escritos.
+    """
+    budget = [0, max_nodes]
+    _write_tree(ast, out, 'repr', 0, max_depth, budget)
+    out.write('\n')
+    return budget[0]
+
+
+def _json_scalar(value):
+    if not isinstance(value, (str, int, float, bool)) and value is not None:
+        value = str(value)
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _write_tree(root, out, style, base_depth, max_depth, budget):
+    """
+    Escribe un valor sin recursión. style 'repr' da el mismo texto que
+    repr(); 'json' escribe tuplas y listas como arreglos JSON. base_depth es
+    la profundidad de root dentro del árbol que se está imprimiendo.
+    budget es [nodos escritos, máximo o None] y se comparte entre llamadas.
+    Retorna False si se cortó por el máximo de nodos (ya escribió '...' y
+    cerró lo que había abierto).
+    """
+    as_json = style == 'json'
+    scalar = _json_scalar if as_json else repr
+    cut = '"..."' if as_json else '...'
+    limit = budget[1]
+    # Pila de (iterador de hijos, cierre, es_tupla, cantidad, índice)
+    stack = []
+    pending = [root]
+
+    while pending or stack:
+        if pending:
+            node = pending.pop()
+            if limit is not None and budget[0] >= limit:
+                out.write(cut)
+                # Cerrar todo lo abierto y terminar
+                while stack:
+                    frame = stack.pop()
+                    out.write(frame[1])
+                return False
+            budget[0] += 1
+
+            if isinstance(node, (tuple, list)):
+                depth = base_depth + len(stack)
+                is_tuple = isinstance(node, tuple)
+                if max_depth is not None and depth >= max_depth:
+                    out.write(cut if as_json else '(...)' if is_tuple else '[...]')
+                elif is_tuple and not as_json:
+                    out.write('(')
+                    stack.append([iter(node), ')', True, len(node), 0])
+                else:
+                    out.write('[')
+                    stack.append([iter(node), ']', is_tuple and not as_json, len(node), 0])
+            else:
+                out.write(scalar(node))
+
+        if not stack:
+            continue
+
+        frame = stack[-1]
+        child = next(frame[0], _END)
+        if child is _END:
+            # Tupla de un elemento: repr() agrega una coma
+            if frame[2] and frame[3] == 1:
+                out.write(',')
+            out.write(frame[1])
+            stack.pop()
+            continue
+        if frame[4]:
+            out.write(', ')
+        frame[4] += 1
+        pending.append(child)
+    return True
+
+
+_END = object()
+
+
+class AstStreamWriter:
+    """
+    Escribe un AST ('program', [declaración, ...]) declaración por
+    declaración, a medida que el parser las produce (ver
+    parse_code(on_declaration=...)), sin esperar al árbol completo.
+      full   -> el mismo texto que write_ast() sobre el AST completo
+      ndjson -> un registro {"index": i, "node": [...]} por declaración
+    max_depth y max_nodes se aplican como en write_ast(); en ndjson la
+    profundidad se cuenta desde cada declaración.
+    """
+    def __init__(self, out, mode='full', max_depth=None, max_nodes=None):
+        self.out = out
+        self.mode = mode
+        self.max_depth = max_depth
+        self.budget = [0, max_nodes]
+        self.count = 0
+        self._state = None  # None: nada escrito, 'open': dentro de la lista, 'done'
+
+    @property
+    def written(self):
+        return self.budget[0]
+
+    def _take(self):
+        written, limit = self.budget
+        if limit is not None and written >= limit:
+            return False
+        self.budget[0] += 1
+        return True
+
+    def _open_program(self):
+        """Escribe "('program', [" con los mismos cortes que write_ast()"""
+        out = self.out
+        depth = self.max_depth
+        self._state = 'done'
+        if not self._take():
+            out.write('...')
+        elif depth is not None and depth <= 0:
+            out.write('(...)')
+        elif not self._take():
+            out.write('(...)')
+        else:
+            out.write("('program', ")
+            if not self._take():
+                out.write('...)')
+            elif depth is not None and depth <= 1:
+                out.write('[...])')
+            else:
+                out.write('[')
+                self._state = 'open'
+
+    def declaration(self, node):
+        index = self.count
+        self.count += 1
+        if self.mode == 'ndjson':
+            if self._state == 'done':
+                return
+            self.out.write(f'{{"index": {index}, "node": ')
+            if not _write_tree(node, self.out, 'json', 0, self.max_depth, self.budget):
+                self._state = 'done'
+            self.out.write('}\n')
+            return
+        if self._state is None:
+            self._open_program()
+        if self._state != 'open':
+            return
+        if index:
+            self.out.write(', ')
+        if not _write_tree(node, self.out, 'repr', 2, self.max_depth, self.budget):
+            self.out.write('])')
+            self._state = 'done'
+
+    def end(self):
+        if self.mode == 'ndjson':
+            return
+        if self._state is None:
+            self._open_program()
+        if self._state == 'open':
+            self.out.write('])')
+        self._state = 'done'
+        self.out.write('\n')
+
+
+def count_ast_nodes(ast):
+    """Cuenta nodos (tuplas, listas y hojas) sin recursión"""
+    count = 0
+    stack = [ast]
+    while stack:
+        node = stack.pop()
+        count += 1
+        if isinstance(node, (tuple, list)):
+            stack.extend(node)
+    return count
@@ -0,0 +1,145 @@
+# package_index.py - Índice de firmas de funciones e imports de un paquete
+#
+# Se construye una sola vez sobre todos los archivos .go de un paquete y se
+# actualiza de forma incremental: sólo se vuelven a parsear los archivos cuyo
+# contenido cambió. SemanticAnalyzer lo usa para resolver las llamadas
+# ('call', pkg, fn, args) con una búsqueda O(1) por llamada.
+import contextlib
+import hashlib
+import io
+from pathlib import Path
+
+import golex
+from goYacc import parse_code
+
+
+def content_hash(code):
+    return hashlib.sha1(code.encode('utf-8')).hexdigest()
+
+
+class PackageIndex:
+    """
+    Índice de firmas:
+      - functions: (paquete, nombre) -> firma
+      - owners:    (paquete, nombre) -> {archivo: firma} de cada archivo
+                   que la declara (varias si está duplicada)
+      - imports:   archivo -> conjunto de paquetes importados
+    """
+    def __init__(self):
+        self.functions = {}
+        self.owners = {}
+        self.imports = {}
+        self.files = {}
+        # paquete -> número de archivos indexados que lo declaran
+        self.package_files = {}
+
+    @classmethod
+    def build(cls, paths):
+        index = cls()
+        for path in paths:
+            index.update_file(path)
+        return index
+
+    @classmethod
+    def build_from_dir(cls, directory):
+        return cls.build(sorted(Path(directory).glob('*.go')))
+
+    # Actualización incremental
+    def update_file(self, path, code=None):
+        """
+        Indexa (o re-indexa) un archivo. Retorna True si el índice cambió,
+        False si el contenido era el mismo de la última vez.
+        """
+        path = str(path)
+        if code is None:
+            with open(path, 'r', encoding='utf-8') as f:
+                code = f.read()
+
+        digest = content_hash(code)
+        entry = self.files.get(path)
+        if entry is not None and entry['hash'] == digest:
+            return False
+
+        # Parseo silencioso y sin tocar el estado del lexer compartido: el
+        # índice puede armarse en medio del análisis de otro archivo
+        lineno, n_errors = golex.lexer.lineno, len(golex.ERRORS)
+        golex.lexer.lineno = 1
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                _, ast, _ = parse_code(code, do_semantic=False)
+        finally:
+            golex.lexer.lineno = lineno
+            del golex.ERRORS[n_errors:]
+        self.remove_file(path)
+        self.add_ast(path, ast, digest)
+        return True
+
+    def add_ast(self, path, ast, digest=None):
+        """Registra las declaraciones de un AST ya parseado"""
+        entry = {'hash': digest, 'package': None, 'functions': []}
+        imports = set()
+
+        tops = ast[1] if ast is not None and ast[0] == 'program' else []
+        for top in tops:
+            if not isinstance(top, tuple):
+                continue
+            if top[0] == 'package':
+                entry['package'] = top[1]
+            elif top[0] == 'import':
+                imports.add(top[1])
+            elif top[0] == 'func':
+                key = (entry['package'], top[1])
+                sig = {
+                    'params': list(top[2] or []),
+                    'return': top[3],
+                    'file': path,
+                }
+                self.owners.setdefault(key, {})[path] = sig
+                self.functions[key] = sig
+                entry['functions'].append(key)
+
+        self.files[path] = entry
+        self.imports[path] = imports
+        pkg = entry['package']
+        self.package_files[pkg] = self.package_files.get(pkg, 0) + 1
+
+    def remove_file(self, path):
+        path = str(path)
+        entry = self.files.pop(path, None)
+        self.imports.pop(path, None)
+        if entry is None:
+            return
+        pkg = entry['package']
+        self.package_files[pkg] -= 1
+        if not self.package_files[pkg]:
+            del self.package_files[pkg]
+        for key in entry['functions']:
+            owners = self.owners.get(key)
+            if owners is None or owners.pop(path, None) is None:
+                continue
+            if owners:
+                # Otro archivo también la declara: queda su firma
+                self.functions[key] = list(owners.values())[-1]
+            else:
+                del self.owners[key]
+                del self.functions[key]
+
+    # Consultas
+    def lookup(self, package, name):
+        return self.functions.get((package, name))
+
+    def files_declaring(self, package, name):
+        """Archivos que declaran package.name (más de uno si está duplicada)"""
+        return list(self.owners.get((package, name), ()))
+
+    def has_package(self, package):
+        return package in self.package_files
+
+    def packages(self):
+        return set(self.package_files)
+
+    def all_imports(self):
+        result = set()
+        for imports in self.imports.values():
+            result |= imports
+        return result
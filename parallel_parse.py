@@ -0,0 +1,157 @@
+# parallel_parse.py - Lexing y parseo en paralelo de un solo archivo enorme
+#
+# Las declaraciones `func` de nivel superior son unidades sintácticas
+# independientes. Se buscan puntos de corte seguros (una palabra `func` con
+# profundidad de llaves 0, fuera de strings, raw strings y comentarios), se
+# parsea cada trozo en un proceso aparte con el número de línea correcto y
+# se unen las listas de declaraciones en un solo ('program', [...]).
+#
+# Si algún trozo produce errores léxicos o sintácticos se repite el parseo
+# de forma secuencial: así los mensajes y la recuperación de errores son
+# exactamente los de parse_code().
+import contextlib
+import io
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from astcodec import decode, encode
+
+# Lo que el lexer consume "en bloque" (strings y comentarios), las llaves y
+# la palabra reservada func. El orden de las alternativas sigue al de golex.
+_SCAN_RE = re.compile(r'''
+    (?=["`/{}f])  # descarta rápido las posiciones que no pueden coincidir
+    (?:
+      (?P<string>"(?:[^\\\n]|\\.)*?")
+    | (?P<raw>`[^`]*`)
+    | (?P<block>/\*[\s\S]*?\*/)
+    | (?P<line>//[^\n]*)
+    | (?P<open>\{)
+    | (?P<close>\})
+    | (?P<func>(?<![A-Za-z_0-9])func(?![A-Za-z_0-9]))
+    )
+''', re.VERBOSE)
+
+# Tamaño mínimo (en caracteres) para que valga la pena paralelizar
+MIN_PARALLEL_SIZE = 256 * 1024
+
+
+def find_split_points(code):
+    """
+    Retorna una lista de (offset, lineas_antes) para cada `func` de nivel
+    superior. lineas_antes son los saltos de línea que cuenta golex antes
+    de ese punto (los raw strings no incrementan lineno en golex).
+    """
+    points = []
+    depth = 0
+    lines = 0
+    counted_to = 0  # los saltos de línea se cuentan de forma incremental
+    for m in _SCAN_RE.finditer(code):
+        kind = m.lastgroup
+        if kind == 'open':
+            depth += 1
+        elif kind == 'close':
+            depth -= 1
+        elif kind == 'func':
+            if depth == 0:
+                start = m.start()
+                lines += code.count('\n', counted_to, start)
+                counted_to = start
+                points.append((start, lines))
+        elif kind == 'raw':
+            # Contar hasta el inicio del raw string y saltar su contenido
+            lines += code.count('\n', counted_to, m.start())
+            counted_to = m.end()
+    return points
+
+
+def make_chunks(code, workers, min_chunk=None):
+    """
+    Agrupa los puntos de corte en trozos de tamaño parecido.
+    Retorna una lista de (texto, lineas_antes).
+    """
+    points = find_split_points(code)
+    if not points:
+        return [(code, 0)]
+
+    target = min_chunk or max(len(code) // (workers * 4), 1)
+    chunks = []
+    # Cabecera (package/import) antes del primer func
+    if code[:points[0][0]].strip():
+        chunks.append((code[:points[0][0]], 0))
+
+    start, start_lines = points[0]
+    for offset, lines in points[1:]:
+        if offset - start >= target:
+            chunks.append((code[start:offset], start_lines))
+            start, start_lines = offset, lines
+    chunks.append((code[start:], start_lines))
+    return chunks
+
+
+def _parse_chunk(text, first_line, engine):
+    """Se ejecuta en el worker: parsea un trozo y captura su salida"""
+    import golex
+    from goYacc import parse_code
+
+    golex.lexer.lineno = first_line
+    golex.ERRORS.clear()
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        ok, ast, _ = parse_code(text, do_semantic=False, engine=engine)
+    clean = ok and ast is not None and not golex.ERRORS and not out.getvalue()
+    # El AST vuelve codificado: cruza el pipe como bytes en lugar de pickle
+    return (clean, encode(ast) if clean else None, golex.lexer.lineno)
+
+
+def parse_code_parallel(code, do_semantic=True, sem_logger=None, git_user=None,
+                        optimize=False, engine='yacc', workers=None, executor=None):
+    """
+    Igual que goYacc.parse_code() pero repartiendo las funciones de nivel
+    superior entre procesos. Retorna (success, ast, sem_errors).
+    Con archivos chicos o un solo worker se parsea de forma secuencial.
+    """
+    import goYacc
+    from golex import lexer
+
+    workers = workers or os.cpu_count() or 1
+    if workers < 2 or len(code) < MIN_PARALLEL_SIZE:
+        return goYacc.parse_code(code, do_semantic, sem_logger, git_user, optimize, engine)
+
+    chunks = make_chunks(code, workers)
+    if len(chunks) < 2:
+        return goYacc.parse_code(code, do_semantic, sem_logger, git_user, optimize, engine)
+
+    base_line = lexer.lineno
+    own_executor = executor is None
+    executor = executor or ProcessPoolExecutor(max_workers=workers)
+    try:
+        futures = [executor.submit(_parse_chunk, text, base_line + lines, engine)
+                   for text, lines in chunks]
+        results = [f.result() for f in futures]
+    finally:
+        if own_executor:
+            executor.shutdown()
+
+    if not all(clean for clean, _, _ in results):
+        # Hubo errores: el parseo secuencial da los mensajes exactos
+        return goYacc.parse_code(code, do_semantic, sem_logger, git_user, optimize, engine)
+
+    tops = []
+    for _, data, _ in results:
+        tops.extend(decode(data)[1])
+    ast = ('program', tops)
+    # Dejar el lexer compartido como lo dejaría un parseo secuencial
+    lexer.lineno = results[-1][2]
+    goYacc.syntax_error_flag = False
+
+    sem_errors = []
+    if do_semantic:
+        if git_user:
+            import semant
+            semant.GIT_USER = git_user
+        sem = sem_logger or goYacc.SemanticAnalyzer()
+        sem_errors = sem.analyze(ast)
+    if optimize:
+        ast, goYacc.last_optimization_stats = goYacc.fold_constants(ast)
+    return (True, ast, sem_errors)
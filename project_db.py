@@ -0,0 +1,281 @@
+# project_db.py - Índice persistente del proyecto en SQLite
+#
+# Cada análisis guarda archivos, funciones, símbolos (symtab) y
+# diagnósticos en una base SQLite local (sqlite3 de la biblioteca
+# estándar). Los archivos se escriben por lotes, una transacción por lote,
+# y un archivo cuyo hash no cambió desde la última corrida no se vuelve a
+# analizar ni a escribir. Junto al hash se guarda la clave del análisis
+# (versión del analizador y opciones como --dataflow): si cambia, el
+# archivo se vuelve a analizar aunque su contenido sea el mismo.
+import argparse
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+from package_index import content_hash
+
+DEFAULT_DB = os.path.join('logs', 'proyecto.db')
+
+# Subir cuando cambien las reglas o lo que se guarda: invalida los
+# resultados de corridas anteriores
+ANALYZER_VERSION = 1
+
+# RETURNING existe desde SQLite 3.35
+_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id          INTEGER PRIMARY KEY,
+    path        TEXT NOT NULL UNIQUE,
+    hash        TEXT NOT NULL,
+    options     TEXT NOT NULL DEFAULT '',
+    package     TEXT,
+    syntax_ok   INTEGER NOT NULL,
+    analyzed_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS functions (
+    file_id     INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    name        TEXT NOT NULL,
+    params      TEXT NOT NULL,
+    return_type TEXT
+);
+CREATE TABLE IF NOT EXISTS symbols (
+    file_id     INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    name        TEXT NOT NULL,
+    type        TEXT
+);
+CREATE TABLE IF NOT EXISTS diagnostics (
+    file_id     INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    seq         INTEGER NOT NULL,
+    severity    TEXT NOT NULL,
+    rule        TEXT NOT NULL,
+    message     TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_functions_name ON functions(name);
+CREATE INDEX IF NOT EXISTS idx_functions_file ON functions(file_id);
+CREATE INDEX IF NOT EXISTS idx_symbols_name ON symbols(name);
+CREATE INDEX IF NOT EXISTS idx_symbols_file ON symbols(file_id);
+CREATE INDEX IF NOT EXISTS idx_diagnostics_rule ON diagnostics(rule);
+CREATE INDEX IF NOT EXISTS idx_diagnostics_file ON diagnostics(file_id, seq);
+"""
+
+
+def analysis_key(dataflow=False):
+    """
+    Versión del analizador y opciones que cambian lo que se guarda. El
+    plegado de constantes no entra: el semántico corre sobre el AST sin
+    optimizar y las firmas de las funciones no cambian al plegar.
+    """
+    return f"v{ANALYZER_VERSION};dataflow={int(bool(dataflow))}"
+
+
+class ProjectDB:
+    """
+    Uso:
+        with ProjectDB('logs/proyecto.db') as db:
+            db.analyze_paths(archivos)
+            db.diagnostics_by_rule('redeclaration')
+    """
+    def __init__(self, path=DEFAULT_DB):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.executescript(SCHEMA)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(files)")}
+        if 'options' not in columns:
+            # Base de una versión anterior: sus filas no coinciden con ninguna clave
+            self.conn.execute("ALTER TABLE files ADD COLUMN options TEXT NOT NULL DEFAULT ''")
+        # ruta -> (hash, clave del análisis)
+        self._hashes = {path: (digest, options) for path, digest, options
+                        in self.conn.execute("SELECT path, hash, options FROM files")}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    # Escritura
+    def is_current(self, path, digest, options=None):
+        """True si el archivo ya se analizó con este contenido y estas opciones"""
+        return self._hashes.get(str(path)) == (digest, options or analysis_key())
+
+    def _write_file(self, path, digest, ast, sem, syntax_ok, options):
+        """Reemplaza todas las filas de un archivo (dentro de la transacción actual)"""
+        package = None
+        functions = []
+        if ast is not None and ast[0] == 'program':
+            for top in ast[1]:
+                if not isinstance(top, tuple):
+                    continue
+                if top[0] == 'package':
+                    package = top[1]
+                elif top[0] == 'func':
+                    functions.append((top[1], json.dumps(top[2]), top[3]))
+
+        upsert = (
+            "INSERT INTO files (path, hash, options, package, syntax_ok, analyzed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(path) DO UPDATE SET hash = excluded.hash, "
+            "options = excluded.options, package = excluded.package, "
+            "syntax_ok = excluded.syntax_ok, analyzed_at = excluded.analyzed_at"
+        )
+        args = (path, digest, options, package, int(syntax_ok),
+                datetime.now().isoformat(timespec='seconds'))
+        if _HAS_RETURNING:
+            file_id = self.conn.execute(upsert + " RETURNING id", args).fetchone()[0]
+        else:
+            self.conn.execute(upsert, args)
+            file_id = self.conn.execute("SELECT id FROM files WHERE path = ?",
+                                        (path,)).fetchone()[0]
+        for table in ('functions', 'symbols', 'diagnostics'):
+            self.conn.execute(f"DELETE FROM {table} WHERE file_id = ?", (file_id,))
+
+        self.conn.executemany(
+            "INSERT INTO functions (file_id, name, params, return_type) VALUES (?, ?, ?, ?)",
+            [(file_id, name, params, ret) for name, params, ret in functions],
+        )
+        if sem is None:
+            return
+        self.conn.executemany(
+            "INSERT INTO symbols (file_id, name, type) VALUES (?, ?, ?)",
+            [(file_id, name, tipo) for name, tipo in sem.symtab.items()],
+        )
+        rows = [(file_id, i, 'error', rule, msg)
+                for i, (rule, msg) in enumerate(zip(sem.error_rules, sem.errors))]
+        rows += [(file_id, len(rows) + i, 'warning', 'dataflow', msg)
+                 for i, msg in enumerate(sem.warnings)]
+        self.conn.executemany(
+            "INSERT INTO diagnostics (file_id, seq, severity, rule, message) VALUES (?, ?, ?, ?, ?)",
+            rows,
+        )
+
+    def record_many(self, results, options=None):
+        """
+        Guarda en una sola transacción una lista de
+        (ruta, hash, ast, analizador semántico, syntax_ok) analizados con
+        las opciones de analysis_key().
+        """
+        options = options or analysis_key()
+        with self.conn:
+            for path, digest, ast, sem, syntax_ok in results:
+                self._write_file(str(path), digest, ast, sem, syntax_ok, options)
+        for path, digest, *_ in results:
+            self._hashes[str(path)] = (digest, options)
+
+    def analyze_paths(self, paths, batch_size=200, dataflow=False, force=False):
+        """
+        Analiza los archivos que cambiaron desde la última corrida y los
+        guarda por lotes. Retorna {'analyzed': n, 'skipped': m}.
+        """
+        from goYacc import parse_code
+        from semant import SemanticAnalyzer
+
+        stats = {'analyzed': 0, 'skipped': 0}
+        options = analysis_key(dataflow)
+        batch = []
+        for path in paths:
+            path = str(path)
+            with open(path, 'r', encoding='utf-8') as f:
+                code = f.read()
+            digest = content_hash(code)
+            if not force and self.is_current(path, digest, options):
+                stats['skipped'] += 1
+                continue
+
+            syntax_ok, ast, _ = parse_code(code, do_semantic=False)
+            sem = None
+            if ast is not None:
+                sem = SemanticAnalyzer(dataflow=dataflow)
+                sem.analyze(ast, write_log=False)
+            batch.append((path, digest, ast, sem, syntax_ok))
+            stats['analyzed'] += 1
+            if len(batch) >= batch_size:
+                self.record_many(batch, options)
+                batch = []
+        if batch:
+            self.record_many(batch, options)
+        return stats
+
+    def remove_file(self, path):
+        with self.conn:
+            self.conn.execute("DELETE FROM files WHERE path = ?", (str(path),))
+        self._hashes.pop(str(path), None)
+
+    # Consultas
+    def _rows(self, sql, args=()):
+        cur = self.conn.execute(sql, args)
+        cols = [c[0] for c in cur.description]
+        return [dict(zip(cols, row)) for row in cur]
+
+    def diagnostics_for_file(self, path):
+        return self._rows(
+            "SELECT d.severity, d.rule, d.message FROM diagnostics d "
+            "JOIN files f ON f.id = d.file_id WHERE f.path = ? ORDER BY d.seq",
+            (str(path),),
+        )
+
+    def diagnostics_by_rule(self, rule):
+        return self._rows(
+            "SELECT f.path, d.severity, d.message FROM diagnostics d "
+            "JOIN files f ON f.id = d.file_id WHERE d.rule = ? ORDER BY f.path, d.seq",
+            (rule,),
+        )
+
+    def rule_counts(self):
+        """{regla: cantidad} sobre todo el proyecto"""
+        return dict(self.conn.execute(
+            "SELECT rule, COUNT(*) FROM diagnostics GROUP BY rule ORDER BY COUNT(*) DESC"))
+
+    def find_symbol(self, name):
+        return self._rows(
+            "SELECT f.path, s.type FROM symbols s JOIN files f ON f.id = s.file_id "
+            "WHERE s.name = ? ORDER BY f.path",
+            (name,),
+        )
+
+    def find_function(self, name):
+        rows = self._rows(
+            "SELECT f.path, f.package, fn.params, fn.return_type FROM functions fn "
+            "JOIN files f ON f.id = fn.file_id WHERE fn.name = ? ORDER BY f.path",
+            (name,),
+        )
+        for row in rows:
+            row['params'] = [tuple(p) for p in json.loads(row['params'])]
+        return rows
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Índice SQLite de símbolos y diagnósticos")
+    ap.add_argument('archivos', nargs='*', help='Archivos .go a analizar e indexar')
+    ap.add_argument('--db', default=DEFAULT_DB, help='Ruta de la base SQLite')
+    ap.add_argument('--dataflow', action='store_true', help='Incluir advertencias de flujo de datos')
+    ap.add_argument('--force', action='store_true', help='Re-analizar aunque el archivo no cambió')
+    ap.add_argument('--rule', help='Listar los diagnósticos de una regla')
+    ap.add_argument('--symbol', help='Buscar un símbolo en todos los archivos')
+    ap.add_argument('--file', help='Listar los diagnósticos de un archivo')
+    args = ap.parse_args()
+
+    with ProjectDB(args.db) as db:
+        if args.archivos:
+            stats = db.analyze_paths(args.archivos, dataflow=args.dataflow, force=args.force)
+            print(f"Analizados: {stats['analyzed']}, sin cambios: {stats['skipped']}")
+        if args.rule:
+            for d in db.diagnostics_by_rule(args.rule):
+                print(f"{d['path']}: [{d['severity']}] {d['message']}")
+        if args.symbol:
+            for s in db.find_symbol(args.symbol):
+                print(f"{s['path']}: {args.symbol} {s['type']}")
+        if args.file:
+            for d in db.diagnostics_for_file(args.file):
+                print(f"[{d['severity']}] ({d['rule']}) {d['message']}")
+
+
+if __name__ == '__main__':
+    main()
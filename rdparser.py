@@ -0,0 +1,435 @@
+# rdparser.py - Parser descendente recursivo (precedence climbing) para Go Lite
+#
+# Alternativa escrita a mano al parser LALR de goYacc. Reconoce la misma
+# gramática, construye el mismo AST y reproduce la recuperación de errores
+# de PLY: cada token inesperado se reporta con el mismo mensaje de p_error()
+# y se descarta, y el análisis sigue en el mismo punto. Un error al final del
+# archivo aborta el parseo (AST None), igual que PLY.
+#
+# Los conjuntos de tokens válidos en cada punto salen de las tablas LALR de
+# parser.out, para que los errores se detecten en el mismo token.
+from golex import lexer as default_lexer
+from hashcons import plain_node
+
+# Niveles de la tabla `precedence` de goYacc. Los operadores de bits no
+# tienen precedencia declarada: PLY los trata como ('right', 0).
+LEVELS = {
+    'BIT_OR': 0, 'BIT_XOR': 0, 'AND_NOT': 0, 'LSHIFT': 0, 'RSHIFT': 0,
+    'OR': 1,
+    'AND': 2,
+    'EQ': 3, 'NE': 3, 'LT': 3, 'LE': 3, 'GT': 3, 'GE': 3,
+    'PLUS': 4, 'MINUS': 4,
+    'TIMES': 5, 'DIVIDE': 5, 'MODULO': 5,
+}
+UNARY_LEVEL = 6
+NONASSOC_LEVEL = 3
+RIGHT_LEVEL = 0
+
+TYPE_TOKENS = {
+    'INT_TYPE': 'INT_TYPE',
+    'FLOAT_TYPE': 'FLOAT_TYPE',
+    'STRING_TYPE': 'STRING_TYPE',
+    'BOOL_TYPE': 'BOOL_TYPE',
+}
+TYPE_NAMES = {'int': 'INT_TYPE', 'float64': 'FLOAT_TYPE', 'string': 'STRING_TYPE', 'bool': 'BOOL_TYPE'}
+
+LITERALS = frozenset(('INTEGER', 'FLOAT', 'STRING_LITERAL', 'RAW_STRING', 'BOOL_LITERAL'))
+EXPR_START = LITERALS | {'ID', 'LPAREN', 'MINUS', 'NOT'}
+STMT_START = EXPR_START | {'VAR', 'IF', 'SEMI'}
+# Tokens que cierran una sentencia (SEMI_OPTIONAL vacío o SEMI)
+STMT_END = STMT_START | {'RBRACE'}
+# Lookahead de reducción de los estados de expresión (unión LALR)
+EXPR_FOLLOW = STMT_END | {'COMMA', 'RPAREN', 'LBRACE'}
+# Lookahead de reducción de type_spec
+TYPE_FOLLOW = STMT_END | {'ASSIGN', 'COMMA', 'RPAREN', 'LBRACE'}
+TOP_START = frozenset(('PACKAGE', 'IMPORT', 'FUNC'))
+
+ASSIGN_OPS = frozenset((
+    'LSHIFT_ASSIGN', 'PLUS_ASSIGN', 'MINUS_ASSIGN', 'TIMES_ASSIGN', 'DIVIDE_ASSIGN',
+    'MOD_ASSIGN', 'AND_ASSIGN', 'OR_ASSIGN', 'XOR_ASSIGN',
+))
+# Después de un ID al inicio de sentencia (estado 28 de parser.out)
+STMT_ID_FOLLOW = (STMT_END | set(LEVELS)) - {'ASSIGN', 'DECLARE_ASSIGN'}
+
+_NO_LEFT = object()
+
+
+class UnexpectedEOF(Exception):
+    pass
+
+
+class RDParser:
+    def __init__(self, lexer=None, make_node=plain_node, on_declaration=None):
+        self.lexer = lexer or default_lexer
+        # Constructor de nodos (HashConsFactory.node para compartir subárboles)
+        self.node = make_node
+        # Recibe cada declaración de nivel superior apenas se parsea
+        self.on_declaration = on_declaration
+        self.tok = None
+        self.error_flag = False
+
+    # Manejo de tokens
+    def _advance(self):
+        tok = self.tok
+        self.tok = self.lexer.token()
+        return tok
+
+    def _error(self):
+        """Reporta el token actual como en p_error() y lo descarta"""
+        self.error_flag = True
+        tok = self.tok
+        if tok is None:
+            print("*** ERROR SINTÁCTICO *** Fin del archivo inesperado")
+            raise UnexpectedEOF()
+        print(f"*** ERROR SINTÁCTICO *** Línea {tok.lineno}, cerca de '{tok.value}'")
+        self.tok = self.lexer.token()
+
+    def _expect(self, ttype):
+        while True:
+            tok = self.tok
+            if tok is not None and tok.type == ttype:
+                self.tok = self.lexer.token()
+                return tok.value
+            self._error()
+
+    def _skip_until(self, valid):
+        while self.tok is None or self.tok.type not in valid:
+            self._error()
+
+    # Punto de entrada
+    def parse(self, code):
+        self.error_flag = False
+        self.lexer.input(code)
+        self.tok = self.lexer.token()
+        try:
+            return self.parse_program()
+        except UnexpectedEOF:
+            return None
+
+    def parse_program(self):
+        tops = []
+        while True:
+            tok = self.tok
+            if tok is None and tops:
+                return self.node('program', tops)
+            if tok is not None and tok.type in TOP_START:
+                top = self.parse_top_declaration()
+                if self.on_declaration is not None:
+                    self.on_declaration(top)
+                tops.append(top)
+            else:
+                self._error()
+
+    def parse_top_declaration(self):
+        kind = self._advance().type
+        if kind == 'PACKAGE':
+            node = self.node('package', self._expect('ID'))
+        elif kind == 'IMPORT':
+            node = self.node('import', self._expect('STRING_LITERAL'))
+        else:
+            name = self._expect('ID')
+            self._expect('LPAREN')
+            params = self.parse_param_list()
+            self._expect('RPAREN')
+            ret = self.parse_func_return()
+            self._expect('LBRACE')
+            body = self.parse_statement_list()
+            self._expect('RBRACE')
+            node = self.node('func', name, params, ret, body)
+        while self.tok is not None and self.tok.type not in TOP_START:
+            self._error()
+        return node
+
+    def parse_param_list(self):
+        params = []
+        while True:
+            tok = self.tok
+            if tok is not None and tok.type == 'RPAREN':
+                return params
+            if tok is None or tok.type != 'ID':
+                self._error()
+                continue
+            self._advance()
+            ptype = self.parse_type_spec()
+            self._skip_until(('COMMA', 'RPAREN'))
+            params.append(self.node(tok.value, ptype))
+            if self.tok.type == 'RPAREN':
+                return params
+            self._advance()  # COMMA
+
+    def parse_func_return(self):
+        while True:
+            tok = self.tok
+            if tok is not None:
+                if tok.type in TYPE_TOKENS:
+                    ret = self.parse_type_spec()
+                    self._skip_until(('LBRACE',))
+                    return ret
+                if tok.type == 'LBRACE':
+                    return None
+            self._error()
+
+    def parse_type_spec(self):
+        while self.tok is None or self.tok.type not in TYPE_TOKENS:
+            self._error()
+        value = self._advance().value
+        self._skip_until(TYPE_FOLLOW)
+        return TYPE_NAMES.get(value, value)
+
+    # Sentencias
+    def parse_statement_list(self):
+        stmts = []
+        while True:
+            tok = self.tok
+            if tok is not None:
+                if tok.type == 'RBRACE':
+                    return stmts
+                if tok.type in STMT_START:
+                    stmts.append(self.parse_statement())
+                    continue
+            self._error()
+
+    def _semi_optional(self):
+        # Después de la expresión: SEMI, o cualquier token que cierre la sentencia
+        if self.tok is not None and self.tok.type == 'SEMI':
+            self._advance()
+            self._skip_until(STMT_END)
+
+    def parse_statement(self):
+        tok = self.tok
+        ttype = tok.type
+
+        if ttype == 'SEMI':
+            self._advance()
+            self._skip_until(STMT_END)
+            return self.node('empty_stmt')
+
+        if ttype == 'VAR':
+            self._advance()
+            name = self._expect('ID')
+            vtype = self.parse_type_spec()
+            while True:
+                cur = self.tok
+                if cur is not None:
+                    if cur.type == 'ASSIGN':
+                        self._advance()
+                        expr = self.parse_expression_in(STMT_END)
+                        self._semi_optional()
+                        return self.node('var', name, vtype, expr)
+                    if cur.type == 'SEMI' or cur.type in STMT_END:
+                        self._semi_optional()
+                        return self.node('var', name, vtype, None)
+                self._error()
+
+        if ttype == 'IF':
+            return self.parse_if()
+
+        if ttype == 'ID':
+            self._advance()
+            while True:
+                cur = self.tok
+                if cur is None:
+                    self._error()
+                ctype = cur.type
+                if ctype == 'DECLARE_ASSIGN':
+                    self._advance()
+                    expr = self.parse_expression_in(STMT_END)
+                    self._semi_optional()
+                    return self.node('declare_short', tok.value, expr)
+                if ctype == 'ASSIGN':
+                    self._advance()
+                    expr = self.parse_expression_in(STMT_END)
+                    self._semi_optional()
+                    return self.node('assign', tok.value, expr)
+                if ctype in ASSIGN_OPS:
+                    self._advance()
+                    expr = self.parse_expression_in(STMT_END)
+                    self._semi_optional()
+                    return self.node('assign', cur.value, tok.value, expr)
+                if ctype == 'DOT':
+                    left = self.parse_call(tok)
+                    break
+                if ctype in STMT_ID_FOLLOW:
+                    left = tok.value
+                    break
+                self._error()
+            expr = self.parse_expression_in(STMT_END, left)
+            self._semi_optional()
+            return expr
+
+        expr = self.parse_expression_in(STMT_END)
+        self._semi_optional()
+        return expr
+
+    def parse_if(self):
+        self._advance()
+        cond = self.parse_expression_in(('LBRACE',))
+        self._advance()
+        then_body = self.parse_statement_list()
+        self._expect('RBRACE')
+        while True:
+            tok = self.tok
+            if tok is not None:
+                if tok.type == 'ELSE':
+                    self._advance()
+                    self._expect('LBRACE')
+                    else_body = self.parse_statement_list()
+                    self._expect('RBRACE')
+                    self._skip_until(STMT_END)
+                    return self.node('if', cond, then_body, else_body)
+                if tok.type in STMT_END:
+                    return self.node('if', cond, then_body, None)
+            self._error()
+
+    # Expresiones
+    def parse_expression_in(self, valid, left=_NO_LEFT):
+        """Expresión completa seguida de uno de los tokens de `valid`"""
+        expr = self.parse_expression(0, None, left)
+        while self.tok is None or self.tok.type not in valid:
+            # El error se detecta con la expresión ya reducida; los
+            # operadores binarios siguen siendo válidos después del token.
+            self._error()
+            expr = self.parse_expression(0, None, expr)
+        return expr
+
+    def parse_expression(self, min_level=0, nonassoc=None, left=_NO_LEFT):
+        if left is _NO_LEFT:
+            left = self.parse_unary()
+        levels = LEVELS
+        while True:
+            tok = self.tok
+            if tok is None:
+                self._error()
+            ttype = tok.type
+            level = levels.get(ttype)
+            if level is None:
+                if ttype in EXPR_FOLLOW:
+                    return left
+                self._error()
+                continue
+            if level == nonassoc:
+                self._error()
+                continue
+            if level < min_level:
+                return left
+            self._advance()
+            if level == RIGHT_LEVEL:
+                right = self.parse_expression(level)
+            elif level == NONASSOC_LEVEL:
+                right = self.parse_expression(level + 1, level)
+            else:
+                right = self.parse_expression(level + 1)
+            left = self.node('binop', tok.value, left, right)
+
+    def parse_unary(self):
+        while True:
+            tok = self.tok
+            if tok is None:
+                self._error()
+            ttype = tok.type
+            if ttype in LITERALS:
+                self.tok = self.lexer.token()
+                return tok.value
+            if ttype == 'ID':
+                self.tok = self.lexer.token()
+                return self.parse_id_factor(tok)
+            if ttype == 'MINUS' or ttype == 'NOT':
+                self._advance()
+                operand = self.parse_expression(UNARY_LEVEL)
+                return self.node('unary', tok.value, operand)
+            if ttype == 'LPAREN':
+                self._advance()
+                expr = self.parse_expression_in(('RPAREN',))
+                self._advance()
+                return expr
+            self._error()
+
+    def parse_id_factor(self, id_tok):
+        while True:
+            tok = self.tok
+            if tok is not None:
+                if tok.type == 'DOT':
+                    return self.parse_call(id_tok)
+                if tok.type in EXPR_FOLLOW or tok.type in LEVELS:
+                    return id_tok.value
+            self._error()
+
+    def parse_call(self, pkg_tok):
+        self._advance()  # DOT
+        fn = self._expect('ID')
+        self._expect('LPAREN')
+        args = []
+        while True:
+            tok = self.tok
+            if tok is not None:
+                if tok.type == 'RPAREN':
+                    break
+                if tok.type in EXPR_START:
+                    arg = self.parse_expression_in(('COMMA', 'RPAREN'))
+                    if self._advance().type == 'RPAREN':
+                        # arg_list : expression  -> [p[1]] if p[1] else []
+                        if arg:
+                            args.append(arg)
+                        return self.node('call', pkg_tok.value, fn, args)
+                    args.append(arg)
+                    continue
+            self._error()
+        self._advance()
+        return self.node('call', pkg_tok.value, fn, args)
+
+
+def parse(code, lexer=None, make_node=plain_node, on_declaration=None):
+    """
+    Retorna:
+      (ast, syntax_ok)
+    """
+    rd = RDParser(lexer, make_node, on_declaration)
+    ast = rd.parse(code)
+    return (ast, not rd.error_flag)
+
+
+def make_benchmark_source(funcs=2000):
+    """Genera un archivo Go Lite grande a partir de examples/algoritmoTeran.go"""
+    body = '''
+func f{n}(a int, b float64) int {{
+    var x int = 10
+    y := 20
+    z := (x | y) ^ (y &^ x)
+    z <<= 1
+    if x < y && !(a == 3) {{
+        fmt.Println("hola", x+y*2-a%3, z)
+    }} else {{
+        fmt.Println(`chao`, -b / 2.5)
+    }}
+}}
+'''
+    return 'package main\n\nimport "fmt"\n' + ''.join(body.format(n=i) for i in range(funcs))
+
+
+def benchmark(code=None, repeat=3):
+    """Compara el tiempo de parseo de PLY (yacc) y de este parser"""
+    import time
+    from goYacc import parse_code
+
+    code = code or make_benchmark_source()
+    results = {}
+    for engine in ('yacc', 'rd'):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            ok, ast, _ = parse_code(code, do_semantic=False, engine=engine)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        results[engine] = (best, ast)
+    return results
+
+
+if __name__ == "__main__":
+    code = make_benchmark_source()
+    results = benchmark(code)
+    yacc_time, yacc_ast = results['yacc']
+    rd_time, rd_ast = results['rd']
+    print(f"Entrada: {len(code)} caracteres")
+    print(f"PLY yacc: {yacc_time:.3f}s")
+    print(f"rdparser: {rd_time:.3f}s  ({yacc_time / rd_time:.2f}x)")
+    print(f"AST idéntico: {yacc_ast == rd_ast}")
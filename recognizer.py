@@ -0,0 +1,103 @@
+# recognizer.py - Modo sólo-validación sintáctica (sin construir el AST)
+#
+# Recorre las mismas tablas LALR que goYacc.parser pero con reducciones
+# vacías: la pila guarda sólo números de estado, no se llama a ningún p_*
+# y no se crean tuplas ni listas del AST. Pensado para hooks de pre-commit
+# que sólo necesitan saber si el archivo es válido y cuáles son los errores.
+#
+# La recuperación de errores es la de p_error(): el token inesperado se
+# descarta y se sigue en el mismo estado; un error al final del archivo
+# termina el reconocimiento.
+from golex import lexer as default_lexer
+from goYacc import parser as lalr_parser
+
+
+def make_error(tok):
+    if tok is None:
+        return {'line': None, 'pos': None, 'type': '$end', 'value': None,
+                'message': "Fin del archivo inesperado"}
+    return {'line': tok.lineno, 'pos': tok.lexpos, 'type': tok.type, 'value': tok.value,
+            'message': f"Línea {tok.lineno}, cerca de '{tok.value}'"}
+
+
+def recognize(code, lexer=None, max_errors=None):
+    """
+    Retorna:
+      (success, syntax_errors)
+    donde syntax_errors es una lista de dicts con line/pos/type/value/message.
+    Con max_errors se detiene después de esa cantidad de errores.
+    """
+    lexer = lexer or default_lexer
+    actions = lalr_parser.action
+    goto = lalr_parser.goto
+    defaulted = lalr_parser.defaulted_states
+    # (longitud, nombre) por producción
+    rules = [(p.len, p.name) for p in lalr_parser.productions]
+
+    errors = []
+    lexer.input(code)
+    get_token = lexer.token
+
+    stack = [0]
+    state = 0
+    tok = None
+    ltype = None
+    while True:
+        if state in defaulted:
+            t = defaulted[state]
+        else:
+            if ltype is None:
+                tok = get_token()
+                ltype = tok.type if tok is not None else '$end'
+            t = actions[state].get(ltype)
+
+        if t is not None:
+            if t > 0:
+                stack.append(t)
+                state = t
+                ltype = None
+                continue
+            if t < 0:
+                plen, name = rules[-t]
+                if plen:
+                    del stack[-plen:]
+                state = goto[stack[-1]][name]
+                stack.append(state)
+                continue
+            # t == 0: aceptar
+            return (not errors, errors)
+
+        # Error sintáctico
+        errors.append(make_error(tok if ltype != '$end' else None))
+        if ltype == '$end':
+            return (False, errors)
+        if max_errors is not None and len(errors) >= max_errors:
+            return (False, errors)
+        ltype = None  # descartar el token y seguir en el mismo estado
+
+
+def check_file(path, max_errors=None):
+    with open(path, 'r', encoding='utf-8') as f:
+        return recognize(f.read(), max_errors=max_errors)
+
+
+def main():
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Uso: python3 recognizer.py archivo.go [archivo.go ...]")
+        sys.exit(2)
+
+    failed = 0
+    for path in sys.argv[1:]:
+        ok, errors = check_file(path)
+        if ok:
+            continue
+        failed += 1
+        for e in errors:
+            print(f"{path}: *** ERROR SINTÁCTICO *** {e['message']}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
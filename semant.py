@@ -1,4 +1,5 @@
 ## semant.py - Analizador semántico simple y logger de errores semánticos
+import itertools
 import os
 import sys
 from datetime import datetime
@@ -22,10 +23,21 @@ GIT_USER = None  # será asignado por main.py
 LOGS_DIR = 'logs'
 os.makedirs(LOGS_DIR, exist_ok=True)
 
-def make_log_filename():
+# Secuencia para los nombres únicos de make_log_filename(unique=True)
+_log_sequence = itertools.count(1)
+
+
+def make_log_filename(user=None, unique=False):
+    """
+    Con unique=True el nombre lleva segundos, pid y un número de secuencia:
+    varios análisis en lote pueden terminar en el mismo minuto.
+    """
     now = datetime.now()
+    user = user or GIT_USER or "UnknownUser"
+    if unique:
+        stamp = now.strftime('%Y%m%d-%H%M%S')
+        return f"semantico-{user}-{stamp}-{os.getpid()}-{next(_log_sequence)}.txt"
     stamp = now.strftime('%Y%m%d-%H%M')
-    user = GIT_USER if GIT_USER else "UnknownUser"
     return f"semantico-{user}-{stamp}.txt"
 
 
@@ -35,10 +47,27 @@ class SemanticAnalyzer:
       - Tabla de símbolos
       - Reglas básicas
     """
-    def __init__(self):
+    def __init__(self, index=None, budget=None, dataflow=False):
         self.symtab = {}
         self.errors = []
+        # Advertencias del análisis de flujo de datos (dataflow.py), opcional
+        self.dataflow = dataflow
+        self.warnings = []
+        # Regla que produjo cada error (paralela a errors)
+        self.error_rules = []
         self.imports = set()
+        # Nombre con el que se usa cada import (último componente de la ruta)
+        self.import_names = set()
+        # Índice de firmas del paquete (package_index.PackageIndex), opcional
+        self.index = index
+        # Límites de tiempo/memoria (budget.AnalysisBudget), opcional
+        self.budget = budget
+        # Ruta del último log escrito por save_log()
+        self.log_file = None
+
+    def _report(self, rule, message):
+        self.errors.append(message)
+        self.error_rules.append(rule)
 
     def rule_if_condition_bool(self, node):
         # Ejemplo: if (cond) { ... }
@@ -46,7 +75,7 @@ class SemanticAnalyzer:
             cond = node[1]
             cond_type = self.infer_type(cond)
             if cond_type != 'BOOL_TYPE':
-                self.errors.append(
+                self._report('if_condition_bool',
                     f"ERROR SEMÁNTICO: La condición del if debe ser bool, se encontró {cond_type}"
                 )
 
@@ -93,7 +122,7 @@ class SemanticAnalyzer:
             declared_type = node[2]
             
             if name in self.symtab:
-                self.errors.append(f"ERROR SEMÁNTICO: Redeclaración de variable '{name}'")
+                self._report('redeclaration', f"ERROR SEMÁNTICO: Redeclaración de variable '{name}'")
             else:
                 self.symtab[name] = declared_type
 
@@ -102,7 +131,7 @@ class SemanticAnalyzer:
             expr = node[2]
             
             if name in self.symtab:
-                self.errors.append(f"ERROR SEMÁNTICO: Redeclaración de variable (:=) '{name}'")
+                self._report('redeclaration', f"ERROR SEMÁNTICO: Redeclaración de variable (:=) '{name}'")
             else:
                 # Inferir el tipo de la expresión
                 inferred = self.infer_type(expr)
@@ -119,13 +148,13 @@ class SemanticAnalyzer:
                         '&&', '||', '!', '&', '|', '^', '<<', '>>', '&^']
             
             if node not in self.symtab and node not in reserved_words and node not in operators:
-                self.errors.append(f"ERROR SEMÁNTICO: Variable '{node}' no declarada")
+                self._report('undefined_var', f"ERROR SEMÁNTICO: Variable '{node}' no declarada")
         
         if isinstance(node, tuple):
             if node[0] == "assign":
                 name = node[1]
                 if name not in self.symtab:
-                    self.errors.append(f"ERROR SEMÁNTICO: Asignación a variable no declarada '{name}'")
+                    self._report('undefined_var', f"ERROR SEMÁNTICO: Asignación a variable no declarada '{name}'")
             elif node[0] == 'binop':
                 # Verificar operandos (pero no el operador en node[1])
                 self.rule_undefined_var(node[2])  # operando izquierdo
@@ -143,7 +172,7 @@ class SemanticAnalyzer:
             if isinstance(expr, tuple):
                 expr_type = self.infer_type(expr)
                 if expr_type and expr_type != declared_type:
-                    self.errors.append(
+                    self._report('type_compatibility',
                         f"ERROR SEMÁNTICO: Incompatibilidad de tipo en variable '{name}' "
                         f"(esperado {declared_type}, obtenido {expr_type})"
                     )
@@ -151,25 +180,25 @@ class SemanticAnalyzer:
 
             # Verificar literales directos
             if declared_type == 'INT_TYPE' and not isinstance(expr, int):
-                self.errors.append(
+                self._report('type_compatibility',
                     f"ERROR SEMÁNTICO: Incompatibilidad de tipo en variable '{name}' "
                     f"(esperado int, obtenido {type(expr).__name__})"
                 )
 
             elif declared_type == 'FLOAT_TYPE' and not isinstance(expr, (float, int)):
-                self.errors.append(
+                self._report('type_compatibility',
                     f"ERROR SEMÁNTICO: Incompatibilidad de tipo en variable '{name}' "
                     f"(esperado float, obtenido {type(expr).__name__})"
                 )
 
             elif declared_type == 'STRING_TYPE' and not isinstance(expr, str):
-                self.errors.append(
+                self._report('type_compatibility',
                     f"ERROR SEMÁNTICO: Incompatibilidad de tipo en variable '{name}' "
                     f"(esperado string, obtenido {type(expr).__name__})"
                 )
             
             elif declared_type == 'BOOL_TYPE' and not isinstance(expr, bool):
-                self.errors.append(
+                self._report('type_compatibility',
                     f"ERROR SEMÁNTICO: Incompatibilidad de tipo en variable '{name}' "
                     f"(esperado bool, obtenido {type(expr).__name__})"
                 )
@@ -179,8 +208,9 @@ class SemanticAnalyzer:
         if isinstance(node, tuple):
             if node[0] == 'import':
                 pkg_name = node[1]
-                # Extraer nombre del paquete (ej: "fmt" de "fmt")
+                # Extraer nombre del paquete (ej: "fmt" de "fmt", "util" de "proyecto/util")
                 self.imports.add(pkg_name)
+                self.import_names.add(pkg_name.rsplit('/', 1)[-1])
             
             elif node[0] == 'call':
                 pkg = node[1]
@@ -189,8 +219,50 @@ class SemanticAnalyzer:
                     # (asumimos que fmt es built-in)
                     pass
 
+    def rule_call_signature(self, node):
+        """Resuelve llamadas pkg.fn(...) contra el índice de firmas del paquete"""
+        if self.index is None or not isinstance(node, tuple) or node[0] != 'call':
+            return
+        pkg, fn, args = node[1], node[2], node[3]
+        # Paquetes externos (fmt, etc.) no están indexados
+        if not self.index.has_package(pkg):
+            return
+
+        if pkg not in self.import_names:
+            self._report('call_signature', f"ERROR SEMÁNTICO: Paquete '{pkg}' usado sin importar")
+
+        sig = self.index.lookup(pkg, fn)
+        if sig is None:
+            self._report('call_signature', f"ERROR SEMÁNTICO: Función '{pkg}.{fn}' no declarada")
+            return
+
+        params = sig['params']
+        if len(args) != len(params):
+            self._report('call_signature',
+                f"ERROR SEMÁNTICO: La función '{pkg}.{fn}' espera {len(params)} "
+                f"argumento(s), se recibieron {len(args)}"
+            )
+            return
+
+        for i, (arg, (pname, ptype)) in enumerate(zip(args, params), 1):
+            if isinstance(arg, str) and arg in self.symtab:
+                arg_type = self.symtab[arg]
+            else:
+                arg_type = self.infer_type(arg)
+            if arg_type in (None, 'inferred') or arg_type == ptype:
+                continue
+            if ptype == 'FLOAT_TYPE' and arg_type == 'INT_TYPE':
+                continue
+            self._report('call_signature',
+                f"ERROR SEMÁNTICO: Argumento {i} ('{pname}') de '{pkg}.{fn}' "
+                f"(esperado {ptype}, obtenido {arg_type})"
+            )
+
     # Recorrido del AST
     def traverse(self, node):
+        if self.budget is not None:
+            # Fuera del try: BudgetExceeded debe cancelar el análisis
+            self.budget.tick()
         try:
             # Primero procesamos imports
             if isinstance(node, tuple) and node[0] == 'import':
@@ -202,6 +274,7 @@ class SemanticAnalyzer:
             # Verificar compatibilidad de tipos
             self.rule_type_compatibility(node)
             self.rule_if_condition_bool(node)
+            self.rule_call_signature(node)
             # Solo verificar variables no declaradas si NO es un tipo ni una tupla binop/unary
             should_check = True
             if isinstance(node, str) and node.endswith('_TYPE'):
@@ -213,7 +286,7 @@ class SemanticAnalyzer:
                 self.rule_undefined_var(node)
             
         except Exception as e:
-            self.errors.append(f"ERROR INTERNO: Error en semántica: {e}")
+            self._report('internal', f"ERROR INTERNO: Error en semántica: {e}")
 
         # Recorrido recursivo
         if isinstance(node, tuple):
@@ -223,6 +296,9 @@ class SemanticAnalyzer:
                 self.traverse(node[3])  # operando derecho
             elif node[0] == 'unary':
                 self.traverse(node[2])  # operando
+            elif node[0] == 'call' and self.index is not None and self.index.has_package(node[1]):
+                # pkg y fn ya se resolvieron con el índice: solo los argumentos
+                self.traverse(node[3])
             elif node[0] == 'var':
                 # No recorrer el tipo (posición 2)
                 self.traverse(node[1])  # nombre
@@ -240,52 +316,98 @@ class SemanticAnalyzer:
                 self.traverse(elem)
 
     # Punto de entrada
-    def analyze(self, ast):
+    def analyze(self, ast, write_log=True):
+        """
+        Con write_log=False no se escribe el archivo de log; el texto se
+        puede obtener después con render_log() (p. ej. para escribirlo de
+        forma asíncrona).
+        """
+        self.begin()
+        if ast is None:
+            self._report('empty_ast', "AST vacío - no se ejecutó análisis.")
+        elif ast[0] == "program":
+            for top in ast[1]:
+                self.feed(top)
+        else:
+            self.traverse(ast)
+        return self.finish(write_log)
+
+    # Análisis incremental: begin(), feed() por cada declaración de nivel
+    # superior en orden, finish(). Lo usa parse_code(stream=True) para
+    # analizar cada func apenas el parser la reduce.
+    def begin(self):
         self.symtab = {}
         self.errors = []
+        self.error_rules = []
+        self.warnings = []
         self.imports = set()
+        self.import_names = set()
+
+    def feed(self, top):
+        """Analiza una declaración; retorna los diagnósticos nuevos (errores y advertencias)"""
+        n_errors, n_warnings = len(self.errors), len(self.warnings)
+        self.traverse(top)
+        if self.dataflow and isinstance(top, tuple) and top[0] == 'func':
+            from dataflow import analyze_function
+            self.warnings.extend(analyze_function(top))
+        return self.errors[n_errors:] + self.warnings[n_warnings:]
+
+    def finish(self, write_log=True):
+        if write_log:
+            self.save_log()
+        return self.errors
 
-        if ast is None:
-            self.errors.append("AST vacío - no se ejecutó análisis.")
+    def render_log(self, user=None):
+        """Texto del reporte semántico"""
+        lines = []
+        lines.append("="*60 + "\n")
+        lines.append("  REPORTE DE ANÁLISIS SEMÁNTICO\n")
+        lines.append("="*60 + "\n\n")
+
+        user = user or GIT_USER or "UnknownUser"
+        lines.append(f"Usuario: {user}\n")
+        lines.append(f"Fecha: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+
+        lines.append("TABLA DE SÍMBOLOS:\n")
+        lines.append("-"*60 + "\n")
+        if self.symtab:
+            for name, tipo in self.symtab.items():
+                lines.append(f"  {name}: {tipo}\n")
+        else:
+            lines.append("  (vacía)\n")
+
+        lines.append("\n" + "="*60 + "\n")
+        lines.append("ERRORES SEMÁNTICOS DETECTADOS:\n")
+        lines.append("="*60 + "\n\n")
+
+        if self.errors:
+            for i, e in enumerate(self.errors, 1):
+                lines.append(f"{i}. {e}\n")
+            lines.append(f"\nTotal de errores: {len(self.errors)}\n")
         else:
-            if ast[0] == "program":
-                for top in ast[1]:
-                    self.traverse(top)
+            lines.append("✔ No se encontraron errores semánticos.\n")
+
+        if self.dataflow:
+            lines.append("\n" + "="*60 + "\n")
+            lines.append("ADVERTENCIAS DE FLUJO DE DATOS:\n")
+            lines.append("="*60 + "\n\n")
+            if self.warnings:
+                for i, w in enumerate(self.warnings, 1):
+                    lines.append(f"{i}. {w}\n")
+                lines.append(f"\nTotal de advertencias: {len(self.warnings)}\n")
             else:
-                self.traverse(ast)
+                lines.append("✔ No se encontraron advertencias.\n")
+        return ''.join(lines)
 
-        # Guardar LOG
-        filename = os.path.join(LOGS_DIR, make_log_filename())
+    def save_log(self, user=None, unique=False):
+        # Guardar LOG (unique=True: ver make_log_filename)
+        filename = os.path.join(LOGS_DIR, make_log_filename(user, unique))
         with open(filename, 'w', encoding='utf-8') as f:
-            f.write("="*60 + "\n")
-            f.write("  REPORTE DE ANÁLISIS SEMÁNTICO\n")
-            f.write("="*60 + "\n\n")
-            
-            user = GIT_USER if GIT_USER else "UnknownUser"
-            f.write(f"Usuario: {user}\n")
-            f.write(f"Fecha: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-            
-            f.write("TABLA DE SÍMBOLOS:\n")
-            f.write("-"*60 + "\n")
-            if self.symtab:
-                for name, tipo in self.symtab.items():
-                    f.write(f"  {name}: {tipo}\n")
-            else:
-                f.write("  (vacía)\n")
-            
-            f.write("\n" + "="*60 + "\n")
-            f.write("ERRORES SEMÁNTICOS DETECTADOS:\n")
-            f.write("="*60 + "\n\n")
-            
-            if self.errors:
-                for i, e in enumerate(self.errors, 1):
-                    f.write(f"{i}. {e}\n")
-                f.write(f"\nTotal de errores: {len(self.errors)}\n")
-            else:
-                f.write("✔ No se encontraron errores semánticos.\n")
+            f.write(self.render_log(user))
+        self.log_file = filename
 
         print(f"[SEMÁNTICO] Log guardado en: {filename}")
-        return self.errors
+        return filename
 
 
 # MAIN SOLO SI EJECUTAS ESTE ARCHIVO DIRECTO
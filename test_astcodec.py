@@ -0,0 +1,158 @@
+# test_astcodec.py - Ida y vuelta de astcodec sobre examples/ y casos borde
+#
+#   python3 -m unittest test_astcodec
+import glob
+import os
+import unittest
+
+import golex
+from astcodec import F_DEEP, KINDS, CodecError, FlatAst, decode, encode
+from goYacc import parse_code
+from hashcons import HashConsFactory
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def parse_file(path, **kwargs):
+    with open(path, 'r', encoding='utf-8') as f:
+        code = f.read()
+    golex.lexer.lineno = 1
+    _, ast, _ = parse_code(code, do_semantic=False, **kwargs)
+    return ast
+
+
+def walk(value):
+    """Nodos del AST (tuplas cuyo primer elemento es un tipo conocido) en preorden"""
+    stack = [value]
+    while stack:
+        v = stack.pop()
+        if isinstance(v, (tuple, list)):
+            if isinstance(v, tuple) and v and isinstance(v[0], str) and v[0] in KINDS:
+                yield v
+            stack.extend(reversed(v))
+
+
+EDGE_CASES = {
+    'listas vacías': ('program', [('func', 'f', [], None, [])]),
+    'if/else anidados': (
+        'program', [('func', 'main', [], None, [
+            ('if', ('binop', '<', 'x', 1), [
+                ('if', True, [('assign', 'x', 2)], [
+                    ('if', ('unary', '!', False), [], [('empty_stmt',)]),
+                ]),
+            ], [('if', 'y', [('assign', '+=', 'y', 1)], None)]),
+        ])]),
+    'strings unicode': ('program', [('var', 'año', 'STRING_TYPE', '"ñandú 🦆"'),
+                                    ('call', 'fmt', 'Println', ['"\\u00e9"', 'é', '\ud800'])]),
+    'enteros negativos y grandes': (
+        'program', [('var', 'a', 'INT_TYPE', -1), ('var', 'b', 'INT_TYPE', -(1 << 31)),
+                    ('var', 'c', 'INT_TYPE', (1 << 31)), ('var', 'd', 'INT_TYPE', 1 << 70),
+                    ('var', 'e', 'INT_TYPE', -(1 << 200) + 7), ('binop', '-', 0, -5)]),
+    'floats, None y bool': ('program', [('binop', '*', 2.5, -0.0), ('var', 'z', 'BOOL_TYPE', None),
+                                        ('var', 't', 'BOOL_TYPE', True)]),
+    'strings con \\0 y largos': ('program', [('var', 's\0t', 'STRING_TYPE', 'x' * 300)]),
+    'contenedores de más de 255 elementos': ('program', [tuple(range(300)), list(range(-300, 0))]),
+}
+
+
+class RoundTripTest(unittest.TestCase):
+    def check(self, ast):
+        data = encode(ast)
+        self.assertEqual(decode(data), ast)
+        flat = FlatAst(data)
+        self.assertEqual(flat.materialize(), ast)
+        self.assertEqual(flat.root().materialize(), ast)
+        return data
+
+    def test_examples(self):
+        paths = sorted(glob.glob(os.path.join(HERE, 'examples', '*.go')))
+        self.assertTrue(paths)
+        for path in paths:
+            with self.subTest(os.path.basename(path)):
+                self.check(parse_file(path))
+
+    def test_examples_hashconsed(self):
+        # Subárboles compartidos: marshal los escribe como referencias
+        for path in sorted(glob.glob(os.path.join(HERE, 'examples', '*.go'))):
+            with self.subTest(os.path.basename(path)):
+                ast = parse_file(path, hashcons=HashConsFactory())
+                data = self.check(ast)
+                flat = FlatAst(data)
+                for view in flat.nodes():
+                    self.assertEqual(view.materialize()[0], view.kind)
+
+    def test_shared_subtrees(self):
+        shared = ('binop', '+', 'a', 1)
+        ast = ('program', [('assign', 'x', shared), ('assign', 'y', shared)])
+        data = self.check(ast)
+        self.assertEqual(data.count(b'binop'), 1)
+        second = FlatAst(data).root()[0][1]
+        self.assertEqual(second[1].kind, 'binop')
+        self.assertEqual(second[1].materialize(), shared)
+        self.assertEqual(FlatAst(data).count_kinds(), {'program': 1, 'assign': 2, 'binop': 1})
+
+    def test_edge_cases(self):
+        for name, ast in EDGE_CASES.items():
+            with self.subTest(name):
+                self.check(ast)
+
+    def test_deep_tree(self):
+        deep = 1
+        for _ in range(50000):
+            deep = ('unary', '-', deep)
+        data = encode(deep)
+        self.assertTrue(FlatAst(data).flags & F_DEEP)
+        # (== sobre tuplas tan profundas agota la recursión: se comparan los bytes)
+        self.assertEqual(encode(decode(data)), data)
+        self.assertEqual(encode(FlatAst(data).materialize()), data)
+        self.assertEqual(FlatAst(data).count_kinds(), {'unary': 50000})
+
+    def test_deep_edge_cases(self):
+        # El codificador iterativo escribe el mismo formato que marshal
+        for name, ast in EDGE_CASES.items():
+            with self.subTest(name):
+                wrapped = ast
+                for _ in range(3000):
+                    wrapped = ('unary', '-', wrapped)
+                data = encode(wrapped)
+                inner = decode(data)
+                for _ in range(3000):
+                    inner = inner[2]
+                self.assertEqual(inner, ast)
+
+
+class FlatAstTest(unittest.TestCase):
+    def test_lazy_views(self):
+        ast = EDGE_CASES['if/else anidados']
+        flat = FlatAst.from_ast(ast)
+        root = flat.root()
+        self.assertEqual(root.kind, 'program')
+        self.assertEqual(len(root), 1)
+        func = root[0][0]
+        self.assertEqual((func.kind, func[0], len(func[1])), ('func', 'main', 0))
+        outer = func[3][0]
+        self.assertEqual(outer.kind, 'if')
+        self.assertEqual(outer[0].materialize(), ('binop', '<', 'x', 1))
+        self.assertIsNone(outer[2][0][2])
+        self.assertEqual([v.materialize() for v in flat.nodes('assign')],
+                         [('assign', 'x', 2), ('assign', '+=', 'y', 1)])
+
+    def test_count_kinds(self):
+        for path in sorted(glob.glob(os.path.join(HERE, 'examples', '*.go'))):
+            ast = parse_file(path)
+            counts = {}
+            for node in walk(ast):
+                counts[node[0]] = counts.get(node[0], 0) + 1
+            self.assertEqual(FlatAst(encode(ast)).count_kinds(), counts)
+
+    def test_errors(self):
+        with self.assertRaises(CodecError):
+            decode(b'XXXX\x04\x00N')
+        with self.assertRaises(CodecError):
+            decode(encode(('program', []))[:-3])
+        with self.assertRaises(CodecError):
+            encode(('program', [object()]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,426 @@
+# xref.py - Índice de referencias cruzadas de identificadores
+#
+# El AST no guarda posiciones, así que el índice se arma con el flujo de
+# tokens mientras el parser lo consume (XrefLexer envuelve al lexer, igual
+# que BudgetedLexer). Cada identificador se clasifica como declaración
+# (package, import, func, parámetro, var, :=) o como uso, y los usos se
+# resuelven contra los ámbitos abiertos por las llaves.
+#
+# Almacenamiento compacto: los nombres se internan una sola vez y cada
+# declaración/uso es una posición en arrays('i') paralelos. Las consultas
+# por nombre o por declaración no recorren el AST:
+#   definitions(name)   -> O(1) + cantidad de declaraciones
+#   usages(name)        -> O(k), k = cantidad de usos
+#   definition_at(pos)  -> O(log n) por búsqueda binaria sobre los offsets
+import json
+import sys
+from array import array
+from bisect import bisect_right
+
+DECL_KINDS = ('package', 'import', 'func', 'param', 'var', 'short')
+USE_KINDS = ('read', 'write', 'package_ref', 'member')
+
+_ASSIGN_TYPES = frozenset((
+    'ASSIGN', 'PLUS_ASSIGN', 'MINUS_ASSIGN', 'TIMES_ASSIGN', 'DIVIDE_ASSIGN',
+    'MOD_ASSIGN', 'AND_ASSIGN', 'OR_ASSIGN', 'XOR_ASSIGN', 'LSHIFT_ASSIGN',
+    'RSHIFT_ASSIGN',
+))
+
+# Una declaración var/:= es visible recién cuando termina la sentencia
+# (en `x := x + 1` el x de la derecha es el de afuera). La sentencia sigue
+# mientras el token anterior cierre un operando y el actual lo continúe.
+_OPERAND_END = frozenset((
+    'ID', 'INTEGER', 'FLOAT', 'STRING_LITERAL', 'RAW_STRING', 'BOOL_LITERAL',
+    'RPAREN', 'RBRACKET', 'INT_TYPE', 'FLOAT_TYPE', 'BOOL_TYPE', 'STRING_TYPE',
+))
+_CONTINUES = _ASSIGN_TYPES | frozenset((
+    'DECLARE_ASSIGN', 'PLUS', 'MINUS', 'TIMES', 'DIVIDE', 'MODULO', 'BIT_OR',
+    'BIT_XOR', 'AND_NOT', 'LSHIFT', 'RSHIFT', 'EQ', 'NE', 'LT', 'LE', 'GT', 'GE',
+    'AND', 'OR', 'AMPERSAND', 'LPAREN', 'LBRACKET', 'DOT', 'COMMA',
+))
+
+NO_DECL = -1
+
+
+class XrefIndex:
+    """
+    Índice de un solo archivo: los offsets de _starts tienen que quedar
+    ordenados para la búsqueda binaria, así que XrefLexer.input() vacía
+    el índice antes de empezar otra entrada.
+    """
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.names = []          # id -> nombre
+        self._name_ids = {}      # nombre -> id
+
+        # Declaraciones
+        self.decl_name = array('i')
+        self.decl_kind = array('b')
+        self.decl_scope = array('i')
+        self.decl_pos = array('i')
+        self.decl_line = array('i')
+
+        # Usos (decl = NO_DECL si no se resolvió)
+        self.use_name = array('i')
+        self.use_kind = array('b')
+        self.use_decl = array('i')
+        self.use_pos = array('i')
+        self.use_line = array('i')
+
+        # Ámbitos: 0 es el ámbito global
+        self.scope_parent = array('i', [NO_DECL])
+        self.scope_start = array('i', [0])
+        self.scope_end = array('i', [-1])
+
+        # Índices para las consultas
+        self._decls_by_name = {}   # name_id -> array('i') de declaraciones
+        self._uses_by_decl = {}    # decl_id -> array('i') de usos
+        self._unresolved = {}      # name_id -> array('i') de usos sin declaración
+        # Todos los identificadores en orden de aparición:
+        # ref >= 0 es un uso, ref < 0 es la declaración -(ref + 1)
+        self._starts = array('i')
+        self._refs = array('i')
+
+    # Construcción
+    def intern(self, name):
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            name_id = len(self.names)
+            self.names.append(sys.intern(name))
+            self._name_ids[name] = name_id
+        return name_id
+
+    def open_scope(self, parent, pos):
+        self.scope_parent.append(parent)
+        self.scope_start.append(pos)
+        self.scope_end.append(-1)
+        return len(self.scope_parent) - 1
+
+    def close_scope(self, scope, pos):
+        self.scope_end[scope] = pos
+
+    def add_decl(self, name, kind, scope, pos, line):
+        name_id = self.intern(name)
+        decl = len(self.decl_name)
+        self.decl_name.append(name_id)
+        self.decl_kind.append(DECL_KINDS.index(kind))
+        self.decl_scope.append(scope)
+        self.decl_pos.append(pos)
+        self.decl_line.append(line)
+        self._decls_by_name.setdefault(name_id, array('i')).append(decl)
+        self._starts.append(pos)
+        self._refs.append(-decl - 1)
+        return decl
+
+    def add_use(self, name, kind, decl, pos, line):
+        name_id = self.intern(name)
+        use = len(self.use_name)
+        self.use_name.append(name_id)
+        self.use_kind.append(USE_KINDS.index(kind))
+        self.use_decl.append(decl)
+        self.use_pos.append(pos)
+        self.use_line.append(line)
+        if decl == NO_DECL:
+            self._unresolved.setdefault(name_id, array('i')).append(use)
+        else:
+            self._uses_by_decl.setdefault(decl, array('i')).append(use)
+        self._starts.append(pos)
+        self._refs.append(use)
+        return use
+
+    def wrap(self, lexer):
+        """Lexer que alimenta este índice mientras el parser lo consume"""
+        return XrefLexer(lexer, self)
+
+    # Registros
+    def decl_record(self, decl):
+        return {
+            'id': decl,
+            'name': self.names[self.decl_name[decl]],
+            'kind': DECL_KINDS[self.decl_kind[decl]],
+            'scope': self.decl_scope[decl],
+            'pos': self.decl_pos[decl],
+            'line': self.decl_line[decl],
+        }
+
+    def use_record(self, use):
+        return {
+            'id': use,
+            'name': self.names[self.use_name[use]],
+            'kind': USE_KINDS[self.use_kind[use]],
+            'decl': self.use_decl[use],
+            'pos': self.use_pos[use],
+            'line': self.use_line[use],
+        }
+
+    # Consultas
+    def definitions(self, name):
+        """Todas las declaraciones de un nombre (en cualquier ámbito)"""
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            return []
+        return [self.decl_record(d) for d in self._decls_by_name.get(name_id, ())]
+
+    def definition(self, name):
+        """La primera declaración del nombre, o None"""
+        defs = self.definitions(name)
+        return defs[0] if defs else None
+
+    def usages_of(self, decl):
+        """Usos resueltos a una declaración concreta"""
+        return [self.use_record(u) for u in self._uses_by_decl.get(decl, ())]
+
+    def usages(self, name, include_unresolved=True):
+        """Usos de un nombre: los de todas sus declaraciones y los no resueltos"""
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            return []
+        uses = []
+        for d in self._decls_by_name.get(name_id, ()):
+            uses.extend(self._uses_by_decl.get(d, ()))
+        if include_unresolved:
+            uses.extend(self._unresolved.get(name_id, ()))
+        uses.sort()
+        return [self.use_record(u) for u in uses]
+
+    def unresolved(self):
+        """{nombre: [usos]} de identificadores sin declaración visible"""
+        return {self.names[n]: [self.use_record(u) for u in uses]
+                for n, uses in self._unresolved.items()}
+
+    def definition_at(self, pos):
+        """
+        Declaración del identificador que ocupa la posición pos (un uso o
+        la propia declaración). Retorna None si ahí no hay identificador o
+        si el uso no tiene declaración.
+        """
+        i = bisect_right(self._starts, pos) - 1
+        if i < 0:
+            return None
+        ref = self._refs[i]
+        if ref < 0:
+            decl = -ref - 1
+            name_id = self.decl_name[decl]
+        else:
+            decl = self.use_decl[ref]
+            name_id = self.use_name[ref]
+        if pos >= self._starts[i] + len(self.names[name_id].rsplit('.', 1)[-1]):
+            return None
+        return self.decl_record(decl) if decl != NO_DECL else None
+
+    # Exportación
+    def as_dict(self):
+        return {
+            'names': self.names,
+            'declarations': [self.decl_record(d) for d in range(len(self.decl_name))],
+            'uses': [self.use_record(u) for u in range(len(self.use_name))],
+            'scopes': [
+                {'id': s, 'parent': self.scope_parent[s],
+                 'start': self.scope_start[s], 'end': self.scope_end[s]}
+                for s in range(len(self.scope_parent))
+            ],
+        }
+
+    def save_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.as_dict(), f, ensure_ascii=False, indent=1)
+        return path
+
+
+def xref_filename(log_file):
+    """logs/semantico-x.txt -> logs/semantico-x.xref.json"""
+    base = log_file[:-4] if log_file.endswith('.txt') else log_file
+    return base + '.xref.json'
+
+
+class XrefLexer:
+    """
+    Envuelve un lexer de PLY y registra identificadores en un XrefIndex.
+    Un ID se clasifica cuando llega el token siguiente (hace falta para
+    distinguir `x :=`, `x =` y `pkg.`).
+    """
+    def __init__(self, lexer, index):
+        self.lexer = lexer
+        self.index = index
+        self._reset()
+
+    def _reset(self):
+        self._scopes = [{}]       # ámbitos abiertos: nombre -> declaración
+        self._scope_ids = [0]
+        self._prev = None         # tipo del token anterior al ID pendiente
+        self._last = None         # tipo del último token visto
+        self._pending = None      # ID esperando al token siguiente
+        self._qualifier = None    # paquete de `pkg.` antes de un miembro
+        self._in_params = False
+        self._func_scope = False  # el próximo `{` es el cuerpo de la función
+        self._hidden = []         # (ámbito, nombre, declaración) aún no visibles
+        self._hidden_new = False  # la declaración oculta llegó con este token
+        self._nesting = 0         # paréntesis/corchetes abiertos desde entonces
+
+    def input(self, code):
+        self._reset()
+        self.index.clear()
+        self.lexer.input(code)
+
+    def token(self):
+        tok = self.lexer.token()
+        self._feed(tok)
+        return tok
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        tok = self.token()
+        if tok is None:
+            raise StopIteration
+        return tok
+
+    def __getattr__(self, name):
+        return getattr(self.lexer, name)
+
+    # Clasificación
+    def _lookup(self, name):
+        for scope in reversed(self._scopes):
+            decl = scope.get(name)
+            if decl is not None:
+                return decl
+        return NO_DECL
+
+    def _declare(self, tok, kind, depth=-1):
+        decl = self.index.add_decl(tok.value, kind, self._scope_ids[depth],
+                                   tok.lexpos, tok.lineno)
+        if kind in ('var', 'short'):
+            self._hidden.append((self._scopes[depth], tok.value, decl))
+            self._hidden_new = True
+            self._nesting = 0
+        else:
+            self._scopes[depth][tok.value] = decl
+
+    def _reveal(self):
+        for scope, name, decl in self._hidden:
+            scope[name] = decl
+        self._hidden = []
+
+    def _statement_ends(self, ttype):
+        """¿El token ttype cierra la sentencia de la declaración oculta?"""
+        if self._hidden_new:
+            self._hidden_new = False
+            return False
+        if ttype in (None, 'SEMI', 'LBRACE', 'RBRACE'):
+            return True
+        if ttype in ('LPAREN', 'LBRACKET'):
+            self._nesting += 1
+        elif ttype in ('RPAREN', 'RBRACKET'):
+            self._nesting -= 1
+        return (self._nesting <= 0 and self._last in _OPERAND_END
+                and ttype not in _CONTINUES and ttype not in ('RPAREN', 'RBRACKET'))
+
+    def _classify(self, tok, prev, nxt):
+        index = self.index
+        if prev == 'PACKAGE':
+            self._declare(tok, 'package', 0)
+        elif prev == 'FUNC':
+            self._declare(tok, 'func', 0)
+        elif prev == 'VAR':
+            self._declare(tok, 'var')
+        elif prev == 'DOT' and self._qualifier is not None:
+            index.add_use(f"{self._qualifier}.{tok.value}", 'member', NO_DECL,
+                          tok.lexpos, tok.lineno)
+            self._qualifier = None
+        elif nxt == 'DOT':
+            index.add_use(tok.value, 'package_ref', self._lookup(tok.value),
+                          tok.lexpos, tok.lineno)
+            self._qualifier = tok.value
+        elif nxt == 'DECLARE_ASSIGN':
+            self._declare(tok, 'short')
+        elif self._in_params and prev in ('LPAREN', 'COMMA'):
+            self._declare(tok, 'param')
+        else:
+            kind = 'write' if nxt in _ASSIGN_TYPES else 'read'
+            index.add_use(tok.value, kind, self._lookup(tok.value),
+                          tok.lexpos, tok.lineno)
+
+    def _feed(self, tok):
+        ttype = tok.type if tok is not None else None
+
+        if self._pending is not None:
+            self._classify(self._pending, self._prev, ttype)
+            self._pending = None
+        if self._hidden and self._statement_ends(ttype):
+            self._reveal()
+
+        if ttype == 'ID':
+            self._pending = tok
+            self._prev = self._last
+        elif ttype == 'STRING_LITERAL' and self._last == 'IMPORT':
+            # import "a/b" declara el nombre b en el ámbito global
+            name = tok.value.rsplit('/', 1)[-1]
+            decl = self.index.add_decl(name, 'import', 0, tok.lexpos, tok.lineno)
+            self._scopes[0][name] = decl
+        elif ttype == 'LPAREN' and self._last == 'ID' and self._prev == 'FUNC':
+            # Los parámetros viven en el mismo ámbito que el cuerpo
+            self._push(tok.lexpos)
+            self._in_params = True
+        elif ttype == 'RPAREN' and self._in_params:
+            self._in_params = False
+            self._func_scope = True
+        elif ttype == 'LBRACE':
+            if self._func_scope:
+                self._func_scope = False
+            else:
+                self._push(tok.lexpos)
+        elif ttype == 'RBRACE':
+            if len(self._scopes) > 1:
+                self.index.close_scope(self._scope_ids.pop(), tok.lexpos)
+                self._scopes.pop()
+        elif ttype is None:
+            # Fin de la entrada: cerrar lo que quedó abierto
+            while len(self._scopes) > 1:
+                self.index.close_scope(self._scope_ids.pop(), -1)
+                self._scopes.pop()
+
+        if ttype != 'DOT' and ttype != 'ID':
+            self._qualifier = None
+        self._last = ttype
+
+    def _push(self, pos):
+        self._scope_ids.append(self.index.open_scope(self._scope_ids[-1], pos))
+        self._scopes.append({})
+
+
+def build_xref(code, engine='yacc'):
+    """Parsea code sólo para armar el índice. Retorna (index, ast)."""
+    import goYacc
+    from golex import lexer
+
+    index = XrefIndex()
+    wrapped = index.wrap(lexer)
+    goYacc.syntax_error_flag = False
+    if engine == 'rd':
+        ast, _ = goYacc.rdparser.parse(code, wrapped)
+    else:
+        ast = goYacc.parser.parse(code, lexer=wrapped)
+    return index, ast
+
+
+def main():
+    if len(sys.argv) < 3:
+        print("Uso: python3 xref.py archivo.go identificador [identificador ...]")
+        sys.exit(2)
+
+    with open(sys.argv[1], 'r', encoding='utf-8') as f:
+        index, _ = build_xref(f.read())
+
+    for name in sys.argv[2:]:
+        print(f"{name}:")
+        for d in index.definitions(name):
+            print(f"  declarado ({d['kind']}) en línea {d['line']}, posición {d['pos']}")
+        for u in index.usages(name):
+            print(f"  usado ({u['kind']}) en línea {u['line']}, posición {u['pos']}")
+
+
+if __name__ == '__main__':
+    main()